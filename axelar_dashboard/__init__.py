@@ -0,0 +1 @@
+"""Shared data helpers for the Axelar Streamlit dashboard pages."""
@@ -0,0 +1,94 @@
+"""Compare cached-frame encodings: pickle (``st.cache_data``) against compressed Arrow IPC.
+
+    python -m axelar_dashboard.bench_cache --rows 200000
+
+Builds synthetic frames shaped like the largest loader results (path tracking, GMP route
+data, the ``GMPStatsByContracts`` contract list, a daily series with HLL sketch exports) and
+prints, per frame and encoding, the stored size, its ratio to the in-memory frame, and the
+time to encode, to decode the whole frame, and to decode a single column.
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from axelar_dashboard.packed import PackedFrame
+from axelar_dashboard.schema import frame_bytes
+
+CODECS = ["zstd", "lz4", "none"]
+
+
+def sample_frames(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    chains = rng.integers(0, 60, size=(rows, 2)).astype("int16")
+    services = pd.Categorical.from_codes(rng.integers(0, 2, rows), categories=["GMP", "Token Transfers"])
+    days = pd.date_range("2022-01-01", periods=min(rows, 1500), freq="D")
+    contracts = max(rows // 10, 1)
+    return {
+        "path_tracking": pd.DataFrame({
+            "Path src_id": chains[:, 0], "Path dst_id": chains[:, 1], "Service Filter": services,
+            "Number of Transfers": rng.zipf(1.6, rows), "Number of Users": rng.zipf(1.8, rows),
+            "Volume of Transfers": rng.lognormal(8, 3, rows).round(2),
+        }),
+        "event_route_data": pd.DataFrame({
+            "Event": pd.Categorical.from_codes(rng.integers(0, 4, rows), categories=["ContractCall", "ContractCallWithToken", "Approved", "Executed"]),
+            "Route src_id": chains[:, 0], "Route dst_id": chains[:, 1],
+            "Number of Transactions": rng.zipf(1.6, rows),
+        }),
+        "gmp_contracts": pd.DataFrame({
+            "Chain": rng.choice([f"chain-{i}" for i in range(60)], contracts),
+            "Contract": [f"0x{value:040x}" for value in rng.integers(0, 2**62, contracts)],
+            "Number of Transactions": rng.zipf(1.5, contracts),
+            "Volume": rng.lognormal(6, 4, contracts),
+        }),
+        "daily_series": pd.DataFrame({
+            "Date": days,
+            "Bridges": rng.integers(100, 50_000, len(days)),
+            "Bridge Amount": rng.lognormal(14, 1, len(days)),
+            "Users Sketch": ['{"version":1,"state":[' + ",".join(map(str, rng.integers(0, 20, 64))) + "]}" for _ in days],
+        }),
+    }
+
+
+def best_of(repeat, call):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def bench(df, repeat):
+    raw = frame_bytes(df)
+    column = df.columns[-1]
+    encode_ms, blob = best_of(repeat, lambda: pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    decode_ms, _ = best_of(repeat, lambda: pickle.loads(blob))
+    # -- a pickle can only be loaded whole
+    rows = [("pickle", len(blob), encode_ms, decode_ms, decode_ms)]
+    for codec in CODECS:
+        encode_ms, packed = best_of(repeat, lambda: PackedFrame.from_frame(df, codec))
+        decode_ms, _ = best_of(repeat, packed.decode)
+        column_ms, _ = best_of(repeat, lambda: packed.decode([column]))
+        rows.append((f"ipc {codec}", packed.nbytes, encode_ms, decode_ms, column_ms))
+    return pd.DataFrame(rows, columns=["encoding", "bytes", "encode_ms", "decode_ms", "column_ms"]).assign(
+        ratio=lambda report: raw / report["bytes"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, df in sample_frames(args.rows, args.seed).items():
+        print(f"{name}: {len(df):,} rows, {frame_bytes(df) / 2**20:.1f} MiB in memory")
+        print(bench(df, args.repeat).to_string(index=False, float_format=lambda value: f"{value:.2f}"))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Build the dashboard's data mart (see :mod:`axelar_dashboard.mart`).
+
+    python -m axelar_dashboard.build_mart --since 2022-01-01 --mart mart
+
+Every run writes a new version directory, building the subjects in parallel. Months of a
+dated subject that the current version already holds in full, up to ``LOOKBACK`` before its
+end, are linked from it instead of being queried again, so a nightly run only queries the
+latest days. ``CURRENT`` is switched to the new version once every subject has been written;
+a failed run leaves the previous version in place. The newest ``KEEP_VERSIONS`` versions are
+kept. Queries go through :func:`axelar_dashboard.backend.connect`, so a mart can also be
+built from a local snapshot.
+"""
+import argparse
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from axelar_dashboard.backend import connect
+from axelar_dashboard.db import read_sql
+from axelar_dashboard.incremental import LOOKBACK
+from axelar_dashboard.mart import MART_DIR, SUBJECTS, current_version, partition_path, read_manifest, subject_query, version_dir
+
+KEEP_VERSIONS = 3
+
+
+def reusable_months(previous_entry, since, until):
+    """Months the previous build covered entirely, ending at least ``LOOKBACK`` before its end."""
+    if previous_entry is None:
+        return set()
+    start = pd.Timestamp(previous_entry["start"])
+    end = pd.Timestamp(previous_entry["end"]) - LOOKBACK
+    return {month for month in pd.period_range(since, until, freq="M")
+            if month.start_time >= start and month.end_time.normalize() <= end}
+
+
+def link(source, target):
+    if not os.path.exists(source):
+        # -- the month had no rows
+        return
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def build_subject(conn, name, root, previous_root, previous_entry, since, until):
+    """Write subject ``name`` under ``root`` and return its manifest entry."""
+    os.makedirs(os.path.join(root, name))
+    if SUBJECTS[name]["date_column"] is None:
+        df = read_sql(subject_query(name), conn)
+        df.to_parquet(partition_path(root, name), index=False, compression="zstd")
+        return {"columns": list(df.columns)}
+
+    reuse = reusable_months(previous_entry, since, until)
+    columns = previous_entry["columns"] if previous_entry else []
+    for month in pd.period_range(since, until, freq="M"):
+        path = partition_path(root, name, month)
+        if month in reuse:
+            link(partition_path(previous_root, name, month), path)
+            continue
+        first, last = max(month.start_time, since), min(month.end_time.normalize(), until)
+        df = read_sql(subject_query(name, first, last), conn)
+        columns = list(df.columns)
+        if not df.empty:
+            df.to_parquet(path, index=False, compression="zstd")
+    return {"start": f"{since:%Y-%m-%d}", "end": f"{until:%Y-%m-%d}", "columns": columns}
+
+
+def prune(mart_dir, keep):
+    versions = sorted(os.listdir(os.path.join(mart_dir, "versions")))
+    for version in versions[:-KEEP_VERSIONS]:
+        if version not in keep:
+            shutil.rmtree(version_dir(mart_dir, version), ignore_errors=True)
+
+
+def build(conn, mart_dir, since, until, workers):
+    previous = current_version(mart_dir)
+    previous_root = version_dir(mart_dir, previous) if previous else None
+    previous_subjects = read_manifest(mart_dir, previous)["subjects"] if previous else {}
+    version = pd.Timestamp.now().strftime("%Y%m%dT%H%M%S")
+    root = version_dir(mart_dir, version)
+    os.makedirs(root)
+
+    try:
+        # -- bring the derived tables up to date once, before the subjects that read them
+        for refresh in {spec["refresh"] for spec in SUBJECTS.values()} - {None}:
+            refresh(conn)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(build_subject, conn, name, root, previous_root, previous_subjects.get(name), since, until)
+                       for name in SUBJECTS}
+            subjects = {name: future.result() for name, future in futures.items()}
+        with open(os.path.join(root, "manifest.json"), "w") as f:
+            json.dump({"version": version, "built_at": pd.Timestamp.now().isoformat(), "subjects": subjects}, f, indent=2)
+    except BaseException:
+        shutil.rmtree(root, ignore_errors=True)
+        raise
+
+    # -- readers switch to the new version in one rename
+    pointer = os.path.join(mart_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    prune(mart_dir, keep={version, previous})
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--since", default="2022-01-01")
+    # -- complete days only: today is still filling up
+    parser.add_argument("--until", default=(pd.Timestamp.today() - pd.Timedelta(days=1)).strftime("%Y-%m-%d"))
+    parser.add_argument("--mart", default=MART_DIR or "mart")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    version = build(connect(), args.mart, pd.Timestamp(args.since), pd.Timestamp(args.until), args.workers)
+    print(f"mart version {version} is current")
+
+
+if __name__ == "__main__":
+    main()
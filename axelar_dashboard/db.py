@@ -0,0 +1,223 @@
+"""Single choke point for the loaders' warehouse and HTTP reads.
+
+After a cache expiry several sessions miss the same cached loader entry at once. Reads
+go through :func:`single_flight`, so concurrent callers with the same key (the SQL text, or
+the URL) wait on one in-flight request and share its result instead of each sending it.
+:func:`read_stats` reports how many calls were issued and how many were coalesced. Warehouse
+queries are then admitted by :mod:`axelar_dashboard.scheduler`.
+
+A read started from a script run executes on a worker thread, and the runs waiting on it
+only wait. When a viewer changes an input, the waiting run hands the rerun (or stop)
+request back to Streamlit as its own checkpoints do and leaves the read. The read keeps
+going: the new run usually asks for the same key and picks it up where it is. Only once no
+run has waited on it for ``CANCEL_GRACE_SECONDS`` (``AXELAR_CANCEL_GRACE_SECONDS``) is it
+abandoned: queued queries leave the scheduler, running Snowflake queries are cancelled
+with ``SYSTEM$CANCEL_QUERY`` and HTTP downloads are closed. An abandoned read is taken out
+of the in-flight table in the same step, so no caller can join it afterwards; a caller
+that finds it abandoned anyway issues the read again instead of failing.
+"""
+import copy
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+from streamlit.runtime.scriptrunner import RerunException, StopException, get_script_run_ctx
+
+from axelar_dashboard.scheduler import CHART, POLL_INTERVAL, QuerySuperseded, scheduler
+
+CHUNK_SIZE = 64 * 1024
+CANCEL_GRACE_SECONDS = float(os.environ.get("AXELAR_CANCEL_GRACE_SECONDS", "2"))
+
+_inflight = {}
+_lock = threading.Lock()
+_stats = {"issued": 0, "coalesced": 0, "errors": 0, "superseded": 0, "reissued": 0}
+
+
+def pending_request(ctx):
+    """Take the rerun/stop request Streamlit has queued for the run behind ``ctx``, if any.
+
+    This is the hand-off a script run makes at each of its own checkpoints; the caller must
+    raise :func:`request_exception` for the request it gets.
+    """
+    script_requests = getattr(ctx, "script_requests", None)
+    return script_requests.on_scriptrunner_yield() if script_requests is not None else None
+
+
+def request_exception(request):
+    if request.type.name == "RERUN":
+        return RerunException(request.rerun_data)
+    return StopException()
+
+
+class _Call:
+    def __init__(self, key, session, priority):
+        self.key = key
+        # -- the most urgent (priority, session) among the callers; see urgency()
+        self.session = session
+        self.priority = priority
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.left_at = None
+
+    def join(self, session, priority):
+        self.waiters += 1
+        self.left_at = None
+        if session is not None and (self.session is None or priority < self.priority):
+            self.session, self.priority = session, priority
+        elif session is None and self.session is None:
+            self.priority = min(self.priority, priority)
+
+    def urgency(self):
+        """The priority and session the read is now wanted at, for the scheduler."""
+        with _lock:
+            return self.priority, self.session
+
+    def leave(self):
+        with _lock:
+            self.waiters -= 1
+            if self.waiters == 0:
+                self.left_at = time.monotonic()
+
+    def superseded(self):
+        """True once no run has waited on the call for the grace period; the call is then unjoinable."""
+        with _lock:
+            if self.waiters or self.left_at is None or time.monotonic() - self.left_at < CANCEL_GRACE_SECONDS:
+                return False
+            if _inflight.get(self.key) is self:
+                del _inflight[self.key]
+            return True
+
+
+def _share(result):
+    # -- followers get their own copy: page code mutates loaded frames in place
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    if isinstance(result, (dict, list)):
+        return copy.deepcopy(result)
+    return result
+
+
+def _lead(call, fetch):
+    try:
+        call.result = fetch(call)
+    except QuerySuperseded as error:
+        call.error = error
+        with _lock:
+            _stats["superseded"] += 1
+    except BaseException as error:
+        call.error = error
+        with _lock:
+            _stats["errors"] += 1
+    finally:
+        with _lock:
+            if _inflight.get(call.key) is call:
+                del _inflight[call.key]
+        call.done.set()
+
+
+def single_flight(key, fetch, priority=CHART):
+    """Return ``fetch(call)``, sharing one execution among concurrent callers with the same ``key``.
+
+    ``fetch`` should poll ``call.superseded()`` and raise :class:`QuerySuperseded` once it is
+    true. ``call.urgency()`` gives the most urgent ``priority`` and session among the callers.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    session = ctx.session_id if ctx is not None else None
+    while True:
+        with _lock:
+            call = _inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _inflight[key] = _Call(key, session, priority)
+                _stats["issued"] += 1
+            else:
+                _stats["coalesced"] += 1
+            call.join(session, priority)
+
+        if leader and ctx is None:
+            _lead(call, fetch)
+        elif leader:
+            # -- off the script thread, so the read outlives a rerun of the run that started it
+            threading.Thread(target=_lead, args=(call, fetch), name="read", daemon=True).start()
+        try:
+            while not call.done.wait(POLL_INTERVAL):
+                request = pending_request(ctx)
+                if request is not None:
+                    raise request_exception(request)
+        finally:
+            call.leave()
+
+        if isinstance(call.error, QuerySuperseded):
+            # -- abandoned before this caller could join it: issue it again
+            with _lock:
+                _stats["reissued"] += 1
+            continue
+        if call.error is not None:
+            raise call.error
+        return call.result if leader else _share(call.result)
+
+
+def _cancel(conn, query_id):
+    try:
+        conn.cursor().execute("SELECT SYSTEM$CANCEL_QUERY(%s)", (query_id,))
+    except Exception:
+        # -- the query may have finished in the meantime; nothing left to cancel
+        pass
+
+
+def _query(query, conn, call):
+    if hasattr(conn, "read_frame"):
+        # -- local DuckDB snapshot (axelar_dashboard.local): in-process, nothing to poll or cancel
+        return conn.read_frame(query)
+    cursor = conn.cursor()
+    try:
+        cursor.execute_async(query)
+        query_id = cursor.sfqid
+        while conn.is_still_running(conn.get_query_status_throw_if_error(query_id)):
+            if call.superseded():
+                _cancel(conn, query_id)
+                raise QuerySuperseded(query_id)
+            time.sleep(POLL_INTERVAL)
+        cursor.get_results_from_sfqid(query_id)
+        rows = cursor.fetchall()
+        columns = [col[0] for col in cursor.description]
+    finally:
+        cursor.close()
+    # -- the conversion pd.read_sql applies to a DBAPI result (Decimal -> float)
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def read_sql(query, conn, priority=CHART):
+    """``pd.read_sql(query, conn)``, coalesced with identical in-flight queries.
+
+    The query goes through the scheduler at the most urgent priority among the callers sharing it.
+    """
+    return single_flight(("sql", query.strip()),
+                         lambda call: scheduler.run(lambda: _query(query, conn, call), *call.urgency(),
+                                                    stale=call.superseded, urgency=call.urgency),
+                         priority)
+
+
+def _download(url, call):
+    with requests.get(url, stream=True) as response:
+        chunks = []
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if call.superseded():
+                raise QuerySuperseded(url)
+            chunks.append(chunk)
+        response._content = b"".join(chunks)
+    return response
+
+
+def http_get(url):
+    """``requests.get(url)``, coalesced with identical in-flight requests."""
+    return single_flight(("get", url), lambda call: _download(url, call))
+
+
+def read_stats():
+    with _lock:
+        return dict(_stats, in_flight=len(_inflight))
@@ -0,0 +1,65 @@
+"""Downsampling of long time series before figure construction.
+
+Daily series over multi-year ranges carry far more points than a half-width chart has
+pixels. :func:`downsample` keeps at most ``MAX_POINTS`` rows using Largest-Triangle-Three-
+Buckets (LTTB), which preserves peaks and troughs, so payload size and browser render time
+follow the chart width rather than the date span. :func:`zoom_window` lets the user narrow
+the range; once the window holds no more than ``MAX_POINTS`` rows it is drawn at full
+resolution.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# -- roughly the pixel width of a half-page chart
+MAX_POINTS = 500
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the ``threshold`` points LTTB keeps from the series ``(x, y)``."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.nan_to_num(np.asarray(y, dtype="float64"))
+
+    # -- first and last points are kept; the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(df, x, columns, threshold=MAX_POINTS):
+    """Rows of ``df`` (sorted by ``x``) that keep the shape of every series in ``columns``.
+
+    Each column gets an equal share of ``threshold`` and the kept rows are the union, so
+    stacked traces stay aligned on the same x values.
+    """
+    if len(df) <= threshold:
+        return df
+    df = df.sort_values(x)
+    xs = df[x]
+    xs = xs.astype("int64") if pd.api.types.is_datetime64_any_dtype(xs) else np.arange(len(df))
+    share = max(3, threshold // len(columns))
+    keep = np.unique(np.concatenate([lttb_indices(xs, df[col], share) for col in columns]))
+    return df.iloc[keep]
+
+
+def zoom_window(df, x, key, threshold=MAX_POINTS):
+    """Date-range slider over ``df[x]``; short series are returned without showing one."""
+    if len(df) <= threshold:
+        return df
+    values = pd.to_datetime(df[x])
+    low, high = values.min().to_pydatetime(), values.max().to_pydatetime()
+    start, end = st.slider("🔍 Zoom", min_value=low, max_value=high, value=(low, high), format="YYYY-MM-DD", key=key)
+    return df[(values >= start) & (values <= end)]
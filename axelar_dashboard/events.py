@@ -0,0 +1,102 @@
+"""Normalized per-transaction event rows shared by the incrementally maintained tables.
+
+The ``axelar`` scope follows the Interoperability Overview (transfer senders). Every
+integrator in :data:`INTEGRATORS` has a scope of its own, ``name.lower()``, read from
+``axelar_integrator_events``: one scan of the source tables (:func:`tagged_events_sql`) tags
+each transfer sent by, and each GMP call approved for, a registered contract with its
+integrator, keeping the transfer recipient or the GMP caller as the user.
+"""
+
+# -- integrator name: contract addresses matched against transfer senders and GMP approvals
+INTEGRATORS = {
+    "Squid": [
+        "0xce16F69375520ab01377ce7B88f5BA8C48F8D666",  # Squid
+        "0x492751eC3c57141deb205eC2da8bFcb410738630",  # Squid-blast
+        "0xDC3D8e1Abe590BCa428a8a2FC4CfDbD1AcF57Bd9",  # Squid-fraxtal
+        "0xdf4fFDa22270c12d0b5b3788F1669D709476111E",  # Squid coral
+        "0xe6B3949F9bBF168f4E3EFc82bc8FD849868CC6d8",  # Squid coral hub
+    ],
+}
+INTEGRATOR_SCOPES = {name.lower(): name for name in INTEGRATORS}
+INTEGRATOR_EVENTS_TABLE = "axelar_integrator_events"
+
+TRANSFER_AMOUNT_USD = """CASE
+      WHEN IS_ARRAY(data:send:amount) OR IS_ARRAY(data:link:price) THEN NULL
+      WHEN IS_OBJECT(data:send:amount) OR IS_OBJECT(data:link:price) THEN NULL
+      WHEN TRY_TO_DOUBLE(data:send:amount::STRING) IS NOT NULL AND TRY_TO_DOUBLE(data:link:price::STRING) IS NOT NULL
+        THEN TRY_TO_DOUBLE(data:send:amount::STRING) * TRY_TO_DOUBLE(data:link:price::STRING)
+      ELSE NULL
+    END"""
+
+GMP_AMOUNT_USD = """CASE
+      WHEN IS_ARRAY(data:value) OR IS_OBJECT(data:value) THEN NULL
+      WHEN TRY_TO_DOUBLE(data:value::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:value::STRING)
+      ELSE NULL
+    END"""
+
+
+def registry_sql(names=None):
+    names = INTEGRATORS if names is None else names
+    return "\n    UNION ALL\n    ".join(f"SELECT '{name}' AS integrator, '{address}' AS address"
+                                    for name in names for address in INTEGRATORS[name])
+
+
+def tagged_events_sql(names=None):
+    """Executed events of the integrators ``names`` (default: all), one row per (integrator, event)."""
+    return f"""
+  WITH registry AS (
+    {registry_sql(names)}
+  )
+  SELECT
+    r.integrator, created_at, id, recipient_address AS user, 'Token Transfers' AS service,
+    LOWER(data:send:original_source_chain) AS source_chain,
+    LOWER(data:send:original_destination_chain) AS destination_chain,
+    {TRANSFER_AMOUNT_USD} AS amount_usd,
+    data:link:asset::STRING AS raw_asset
+  FROM axelar.axelscan.fact_transfers
+  JOIN registry r ON sender_address ILIKE '%' || r.address || '%'
+  WHERE status = 'executed' AND simplified_status = 'received'
+
+  UNION ALL
+
+  SELECT
+    r.integrator, created_at, id, data:call.transaction.from::STRING AS user, 'GMP' AS service,
+    LOWER(data:call.chain::STRING) AS source_chain,
+    LOWER(data:call.returnValues.destinationChain::STRING) AS destination_chain,
+    {GMP_AMOUNT_USD} AS amount_usd,
+    data:symbol::STRING AS raw_asset
+  FROM axelar.axelscan.fact_gmp
+  JOIN registry r ON data:approved:returnValues:contractAddress::STRING ILIKE '%' || r.address || '%'
+  WHERE status = 'executed' AND simplified_status = 'received'
+"""
+
+
+def events_sql(scope):
+    if scope in INTEGRATOR_SCOPES:
+        return f"""
+  SELECT created_at, id, user, service, source_chain, destination_chain, amount_usd
+  FROM {INTEGRATOR_EVENTS_TABLE}
+  WHERE integrator = '{INTEGRATOR_SCOPES[scope]}'
+"""
+    if scope != "axelar":
+        raise ValueError(f"Unknown event scope: {scope}")
+
+    return f"""
+  SELECT
+    created_at, id, sender_address AS user, 'Token Transfers' AS service,
+    LOWER(data:send:original_source_chain) AS source_chain,
+    LOWER(data:send:original_destination_chain) AS destination_chain,
+    {TRANSFER_AMOUNT_USD} AS amount_usd
+  FROM axelar.axelscan.fact_transfers
+  WHERE status = 'executed' AND simplified_status = 'received'
+
+  UNION ALL
+
+  SELECT
+    created_at, id, data:call.transaction.from::STRING AS user, 'GMP' AS service,
+    LOWER(data:call.chain::STRING) AS source_chain,
+    LOWER(data:call.returnValues.destinationChain::STRING) AS destination_chain,
+    {GMP_AMOUNT_USD} AS amount_usd
+  FROM axelar.axelscan.fact_gmp
+  WHERE status = 'executed' AND simplified_status = 'received'
+"""
@@ -0,0 +1,124 @@
+"""Memoized Plotly figure construction.
+
+Figure builders decorated with :func:`memoized_figure` run only when the figure id, the data
+they plot, or their layout arguments change, so reruns caused by unrelated widgets skip
+``go.Figure``/``px.*`` construction altogether. The data is identified by a ``data_key``
+when the caller passes one: the arguments and data versions of the loader the frame came
+from, which must change whenever its rows can. The frames are then not hashed. Without a
+``data_key`` (frames from unversioned sources, or reshaped by widgets such as the zoom
+slider) the frames' contents are hashed.
+
+Hits return a :class:`FrozenFigure`, whose dict is built once. ``st.plotly_chart`` takes a
+figure object as already validated and only serializes its dict, whereas a plain dict is
+validated again on every call. The figures are kept in the shared loader cache
+(:mod:`axelar_dashboard.shared`), under its byte budget, and shared by all sessions; they
+must not be modified.
+"""
+import functools
+import hashlib
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+
+from axelar_dashboard.shared import cache_get, cache_put
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+class FrozenFigure(go.Figure):
+    """A built figure with its dict computed once; ``to_dict`` returns that dict, not a copy."""
+
+    @classmethod
+    def freeze(cls, fig):
+        frozen = cls(fig)
+        frozen._frozen = go.Figure.to_dict(frozen)
+        frozen._frozen_bytes = len(json.dumps(frozen._frozen, cls=PlotlyJSONEncoder))
+        return frozen
+
+    def to_dict(self):
+        return self._frozen
+
+    @property
+    def nbytes(self):
+        # -- the graph objects and the dict hold the data about twice over
+        return 2 * self._frozen_bytes
+
+
+def _update(digest, value, contents=True):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr((type(value).__name__, value.shape, list(getattr(value, "columns", [value.name])))).encode())
+        if contents:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (pd.Index, np.ndarray)):
+        digest.update(repr((type(value).__name__, value.shape, str(value.dtype))).encode())
+        if contents:
+            digest.update(pd.util.hash_array(np.asarray(value).ravel()).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item, contents)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for name in sorted(value, key=repr):
+            _update(digest, name, contents)
+            _update(digest, value[name], contents)
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(*values, contents=True):
+    """Hash of ``values``; with ``contents=False`` frames and arrays count only by shape and columns."""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _update(digest, value, contents)
+    return digest.hexdigest()
+
+
+def memoized_figure(build):
+    """Cache ``build(*frames, **layout)`` by (builder, data, layout params).
+
+    Callers may pass ``data_key=`` (not forwarded to ``build``) to identify the frames'
+    data instead of hashing them, e.g. the loader arguments and data versions they came from.
+    """
+    figure_id = f"figure {build.__qualname__} ({build.__code__.co_filename})"
+
+    @functools.wraps(build)
+    def wrapper(*args, data_key=None, **kwargs):
+        if data_key is None:
+            key = (figure_id, fingerprint(args, kwargs))
+        else:
+            key = (figure_id, repr(data_key), fingerprint(args, kwargs, contents=False))
+        fig = cache_get(key)
+        if fig is not None:
+            with _lock:
+                _stats["hits"] += 1
+            return fig
+        fig = FrozenFigure.freeze(build(*args, **kwargs))
+        cache_put(key, fig)
+        with _lock:
+            _stats["misses"] += 1
+        return fig
+
+    return wrapper
+
+
+@memoized_figure
+def express_figure(kind, data, layout=None, traces=None, **kwargs):
+    """Memoized ``px.<kind>(data, **kwargs)`` followed by ``update_layout``/``update_traces``."""
+    fig = getattr(px, kind)(data, **kwargs)
+    if traces:
+        fig.update_traces(**traces)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
+
+
+def figure_cache_stats():
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,66 @@
+"""Persistent user first-seen index.
+
+``axelar_user_first_seen`` keeps one row per (scope, user) with the timestamp of the user's
+first executed transaction and the service and source chain it used. It is extended from a
+watermark, so new/returning user series only join the index against the selected window
+instead of taking ``min(created_at)`` per user over the whole event history on every call.
+"""
+import streamlit as st
+
+from axelar_dashboard.events import events_sql
+from axelar_dashboard.incremental import execute, read_watermark, refresh_window, write_watermark
+
+FIRST_SEEN_TABLE = "axelar_user_first_seen"
+REFRESH_TTL = 3600
+
+
+def ensure_first_seen_table(conn):
+    execute(conn, f"""
+    CREATE TABLE IF NOT EXISTS {FIRST_SEEN_TABLE} (
+        scope STRING,
+        user STRING,
+        first_seen_at TIMESTAMP_NTZ,
+        first_service STRING,
+        first_chain STRING
+    ) CLUSTER BY (scope, TO_DATE(first_seen_at))
+    """)
+
+
+def refresh_first_seen(conn, scope):
+    """Fold events newer than the watermark into the index and return the new watermark."""
+    ensure_first_seen_table(conn)
+    name = f"{FIRST_SEEN_TABLE}:{scope}"
+    source = events_sql(scope)
+    since, high = refresh_window(conn, name, source)
+    if high is None:
+        return read_watermark(conn, name)
+
+    execute(conn, f"""
+    MERGE INTO {FIRST_SEEN_TABLE} t
+    USING (
+        SELECT '{scope}' AS scope, user,
+            MIN(created_at) AS first_seen_at,
+            MIN_BY(service, created_at) AS first_service,
+            MIN_BY(source_chain, created_at) AS first_chain
+        FROM ({source})
+        WHERE created_at >= '{since:%Y-%m-%d %H:%M:%S}' AND created_at <= '{high:%Y-%m-%d %H:%M:%S.%f}'
+          AND user IS NOT NULL
+        GROUP BY user
+    ) s ON t.scope = s.scope AND t.user = s.user
+    WHEN MATCHED AND s.first_seen_at < t.first_seen_at THEN UPDATE SET
+        first_seen_at = s.first_seen_at, first_service = s.first_service, first_chain = s.first_chain
+    WHEN NOT MATCHED THEN INSERT (scope, user, first_seen_at, first_service, first_chain)
+        VALUES (s.scope, s.user, s.first_seen_at, s.first_service, s.first_chain)
+    """)
+    write_watermark(conn, name, high)
+    return high
+
+
+@st.cache_data(ttl=REFRESH_TTL, show_spinner=False)
+def first_seen_version(_conn, scope):
+    """Refresh the index at most once per ``REFRESH_TTL`` and return its watermark.
+
+    Loaders that read the index take this value as an argument so their cached results
+    are invalidated whenever the index moves forward.
+    """
+    return str(refresh_first_seen(_conn, scope))
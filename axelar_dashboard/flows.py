@@ -0,0 +1,42 @@
+"""Top-K pruning of chain-to-chain flows before drawing them as a Sankey diagram.
+
+A Sankey over every path has one link per source/destination pair, which grows with the
+square of the chain count and quickly stops rendering usefully in the browser.
+:func:`prune_flows` keeps the ``k`` heaviest paths, picked with a heap in
+``O(E log k)``, and folds every other path into an ``Other`` aggregate:
+
+- a dropped path from a chain that has a kept path becomes part of ``chain➡Other``;
+- otherwise, a dropped path into a chain that has a kept path becomes part of ``Other➡chain``;
+- anything else becomes part of ``Other➡Other``.
+
+The result has at most ``3k + 1`` links, whatever the number of chains, and the same total.
+"""
+import heapq
+
+import pandas as pd
+
+OTHER = "Other"
+TOP_K = 30
+
+
+def prune_flows(edges, k=TOP_K, weight="volume"):
+    """``Source, Destination, <weight>`` links from ``src, dst, <weight>`` edges (see :func:`axelar_dashboard.graph.path_edges`)."""
+    rows = [(src, dst, value) for src, dst, value in zip(edges["src"], edges["dst"], edges[weight]) if value > 0]
+    top = heapq.nlargest(k, rows, key=lambda row: row[2])
+    kept = {(src, dst) for src, dst, _ in top}
+    sources = {src for src, _, _ in top}
+    destinations = {dst for _, dst, _ in top}
+
+    links = {(src, dst): value for src, dst, value in top}
+    for src, dst, value in rows:
+        if (src, dst) in kept:
+            continue
+        if src in sources:
+            link = (src, OTHER)
+        elif dst in destinations:
+            link = (OTHER, dst)
+        else:
+            link = (OTHER, OTHER)
+        links[link] = links.get(link, 0) + value
+    df = pd.DataFrame([(src, dst, value) for (src, dst), value in links.items()], columns=["Source", "Destination", weight])
+    return df.sort_values(weight, ascending=False).reset_index(drop=True)
@@ -0,0 +1,199 @@
+"""Directed chain graph built from path aggregates, updated edge by edge.
+
+Path tables (one row per ``source➡destination`` path) become a ``networkx.DiGraph`` with one
+edge per path weighted by transactions, USD volume and fees. :func:`update_chain_graph` keeps one graph
+per key, the inputs the aggregate was loaded for (e.g. a page and its date range), for the
+``MAX_GRAPHS`` most recently used keys. When the data behind a key is refreshed, the new
+aggregate is applied as a diff: only the edges that changed are touched, and only their
+endpoints' flows and the components they belong to are recomputed. A different date range
+gets its own graph rather than rewriting another session's. Each update returns an immutable
+:class:`GraphSnapshot` taken under the same lock, so a concurrent update cannot change the
+edges between the update and the reads.
+
+Per chain it reports outflow, inflow and net flow (transactions and USD), the fees paid on
+outgoing paths, its share of the traffic and its betweenness centrality, i.e. how many
+shortest routes between other chains run through it. Betweenness is computed within each
+weakly connected component on the route topology alone, so a change of weights leaves it
+untouched and a new or vanished route recomputes only its component.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from axelar_dashboard.schema import DST_SUFFIX, SRC_SUFFIX, chains
+
+WEIGHTS = ("txns", "volume", "fees")
+MAX_GRAPHS = 32
+
+GraphSnapshot = namedtuple("GraphSnapshot", ["nodes", "components"])
+
+_graphs = OrderedDict()
+_lock = threading.Lock()
+
+
+def path_edges(df, path_column, txns, volume, fees):
+    """``src, dst, txns, volume, fees`` rows from a path table compacted by :func:`axelar_dashboard.schema.compact`."""
+    # -- chain id -1 (missing chain) picks the trailing None and the row is dropped
+    names = np.array(chains.names() + [None], dtype=object)
+    edges = pd.DataFrame({
+        "src": names[df[path_column + SRC_SUFFIX].to_numpy(dtype="int64")],
+        "dst": names[df[path_column + DST_SUFFIX].to_numpy(dtype="int64")],
+        "txns": df[txns].to_numpy(dtype="float64"),
+        "volume": df[volume].to_numpy(dtype="float64"),
+        "fees": df[fees].to_numpy(dtype="float64"),
+    }).dropna(subset=["src", "dst"])
+    return edges.fillna(0).groupby(["src", "dst"], as_index=False)[list(WEIGHTS)].sum()
+
+
+class ChainGraph:
+    def __init__(self):
+        self.graph = nx.DiGraph()
+        self._flows = {}
+        self._component = {}
+        self._members = {}
+        self._betweenness = {}
+        self._next_component = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.stats = {"updates": 0, "edges_changed": 0, "components_recomputed": 0}
+
+    def update(self, edges):
+        """Make the graph's edges those of ``edges`` (see :func:`path_edges`) and return its :class:`GraphSnapshot`."""
+        new = {(row.src, row.dst): (row.txns, row.volume, row.fees) for row in edges.itertuples(index=False)}
+        with self._lock:
+            old = {(src, dst): tuple(data[weight] for weight in WEIGHTS) for src, dst, data in self.graph.edges(data=True)}
+            changed = {edge for edge in old.keys() | new.keys() if old.get(edge) != new.get(edge)}
+            self.stats["updates"] += 1
+            self.stats["edges_changed"] += len(changed)
+            if changed:
+                self._apply(old, new, changed)
+                self._snapshot = None
+            if self._snapshot is None:
+                self._snapshot = GraphSnapshot(self._node_metrics(), self._components())
+            return self._snapshot
+
+    def _apply(self, old, new, changed):
+        # -- only an added or removed route changes components and shortest routes
+        rewired = {edge for edge in changed if (edge in old) != (edge in new)}
+        touched = set()
+        for edge in rewired:
+            for node in edge:
+                touched |= self._members.get(self._component.get(node), {node})
+        for edge in changed:
+            if edge in new:
+                self.graph.add_edge(*edge, **dict(zip(WEIGHTS, new[edge])))
+            else:
+                self.graph.remove_edge(*edge)
+        endpoints = {node for edge in changed for node in edge}
+        for node in endpoints:
+            if self.graph.has_node(node) and self.graph.degree(node) == 0:
+                self.graph.remove_node(node)
+        self._refresh_flows(endpoints)
+        if touched:
+            self._refresh_components(touched)
+
+    def _refresh_flows(self, nodes):
+        for node in nodes:
+            if not self.graph.has_node(node):
+                self._flows.pop(node, None)
+                continue
+            out_edges = [data for _, _, data in self.graph.out_edges(node, data=True)]
+            in_edges = [data for _, _, data in self.graph.in_edges(node, data=True)]
+            self._flows[node] = {
+                "out_txns": sum(data["txns"] for data in out_edges),
+                "in_txns": sum(data["txns"] for data in in_edges),
+                "out_volume": sum(data["volume"] for data in out_edges),
+                "in_volume": sum(data["volume"] for data in in_edges),
+                "fees": sum(data["fees"] for data in out_edges),
+            }
+
+    def _refresh_components(self, nodes):
+        for node in nodes:
+            self._members.pop(self._component.pop(node, None), None)
+            self._betweenness.pop(node, None)
+        subgraph = self.graph.subgraph(node for node in nodes if self.graph.has_node(node))
+        for members in nx.weakly_connected_components(subgraph):
+            component = self._next_component
+            self._next_component += 1
+            self._members[component] = set(members)
+            for node in members:
+                self._component[node] = component
+            # -- unnormalized, so components computed at different times stay comparable
+            self._betweenness.update(nx.betweenness_centrality(self.graph.subgraph(members), normalized=False))
+            self.stats["components_recomputed"] += 1
+
+    def _component_rows(self):
+        # -- numbered by traffic, so the numbers do not depend on the order of past updates
+        rows = []
+        for component, members in self._members.items():
+            subgraph = self.graph.subgraph(members)
+            rows.append((component, {
+                "Number of Chains": len(members),
+                "Chains": ", ".join(sorted(members)),
+                "Txns": round(subgraph.size(weight="txns")),
+                "Volume ($)": round(subgraph.size(weight="volume")),
+            }))
+        rows.sort(key=lambda row: (-row[1]["Txns"], row[1]["Chains"]))
+        return {component: dict(row, Component=number) for number, (component, row) in enumerate(rows, start=1)}
+
+    def _node_metrics(self):
+        # -- one row per chain: flows, fees, traffic share, betweenness and component
+        nodes = list(self.graph.nodes)
+        flows = pd.DataFrame.from_dict({node: self._flows[node] for node in nodes}, orient="index")
+        numbers = {component: row["Component"] for component, row in self._component_rows().items()}
+        components = {node: numbers[self._component[node]] for node in nodes}
+        betweenness = {node: self._betweenness.get(node, 0.0) for node in nodes}
+        if flows.empty:
+            return pd.DataFrame(columns=["Chain", "Outflow Txns", "Inflow Txns", "Net Txns", "Outflow ($)", "Inflow ($)",
+                                         "Net Flow ($)", "Fees Paid ($)", "Traffic Share (%)", "Betweenness", "Component"])
+        count = len(nodes)
+        scale = 1 / ((count - 1) * (count - 2)) if count > 2 else 0.0
+        total = flows["out_txns"].sum()
+        df = pd.DataFrame({
+            "Chain": flows.index,
+            "Outflow Txns": flows["out_txns"].round(),
+            "Inflow Txns": flows["in_txns"].round(),
+            "Net Txns": (flows["in_txns"] - flows["out_txns"]).round(),
+            "Outflow ($)": flows["out_volume"].round(),
+            "Inflow ($)": flows["in_volume"].round(),
+            "Net Flow ($)": (flows["in_volume"] - flows["out_volume"]).round(),
+            "Fees Paid ($)": flows["fees"].round(2),
+            "Traffic Share (%)": ((flows["out_txns"] + flows["in_txns"]) / (2 * total) * 100 if total else 0.0),
+            "Betweenness": pd.Series(betweenness) * scale,
+            "Component": pd.Series(components),
+        })
+        return df.sort_values(["Betweenness", "Traffic Share (%)"], ascending=False).reset_index(drop=True)
+
+    def _components(self):
+        # -- one row per weakly connected component: its chains and the traffic within it
+        rows = list(self._component_rows().values())
+        return pd.DataFrame(rows, columns=["Component", "Number of Chains", "Chains", "Txns", "Volume ($)"])
+
+
+def update_chain_graph(key, edges):
+    """Apply ``edges`` to the graph kept for ``key`` and return its :class:`GraphSnapshot`.
+
+    ``key`` names what ``edges`` were loaded for, e.g. ``("overview", start_date, end_date)``;
+    the snapshot's frames are shared between sessions and must not be modified.
+    """
+    with _lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            graph = _graphs[key] = ChainGraph()
+            while len(_graphs) > MAX_GRAPHS:
+                _graphs.popitem(last=False)
+        _graphs.move_to_end(key)
+    return graph.update(edges)
+
+
+def chain_graph_stats():
+    with _lock:
+        graphs = dict(_graphs)
+    stats = {}
+    for key, graph in graphs.items():
+        with graph._lock:
+            stats[key] = dict(graph.stats, nodes=graph.graph.number_of_nodes(), edges=graph.graph.number_of_edges())
+    return stats
@@ -0,0 +1,63 @@
+"""Watermarks for tables the dashboard maintains incrementally in its own Snowflake schema.
+
+Every derived table records how far it has consumed the source events under a name in
+``dashboard_watermarks``. A refresh re-reads a short lookback window before the watermark
+so rows that land late in ``fact_transfers`` / ``fact_gmp`` are still picked up.
+"""
+import pandas as pd
+
+WATERMARK_TABLE = "dashboard_watermarks"
+EPOCH = pd.Timestamp("1970-01-01")
+LOOKBACK = pd.Timedelta(days=2)
+
+
+def execute(conn, sql, params=None):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall() if cur.description else []
+
+
+def ensure_watermark_table(conn):
+    execute(conn, f"""
+    CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+        name STRING,
+        watermark TIMESTAMP_NTZ,
+        updated_at TIMESTAMP_NTZ
+    )
+    """)
+
+
+def read_watermark(conn, name):
+    rows = execute(conn, f"SELECT watermark FROM {WATERMARK_TABLE} WHERE name = %s", (name,))
+    if not rows or rows[0][0] is None:
+        return EPOCH
+    return pd.Timestamp(rows[0][0])
+
+
+def write_watermark(conn, name, watermark):
+    execute(conn, f"""
+    MERGE INTO {WATERMARK_TABLE} t
+    USING (SELECT %s AS name, CAST(%s AS TIMESTAMP_NTZ) AS watermark) s ON t.name = s.name
+    WHEN MATCHED THEN UPDATE SET watermark = s.watermark, updated_at = CURRENT_TIMESTAMP()::TIMESTAMP_NTZ
+    WHEN NOT MATCHED THEN INSERT (name, watermark, updated_at)
+        VALUES (s.name, s.watermark, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ)
+    """, (name, watermark.strftime("%Y-%m-%d %H:%M:%S.%f")))
+
+
+def refresh_window(conn, name, events_sql, time_column="created_at"):
+    """Return ``(since, high)`` bounds for the next incremental pass over ``events_sql``.
+
+    ``high`` is the newest event currently visible, or ``None`` when nothing arrived since
+    the watermark and the refresh can be skipped.
+    """
+    ensure_watermark_table(conn)
+    watermark = read_watermark(conn, name)
+    since = max(watermark - LOOKBACK, EPOCH)
+    rows = execute(conn, f"""
+    SELECT MAX({time_column}) FROM ({events_sql})
+    WHERE {time_column} >= '{since:%Y-%m-%d %H:%M:%S}'
+    """)
+    high = rows[0][0] if rows else None
+    if high is None or pd.Timestamp(high) <= watermark:
+        return since, None
+    return since, pd.Timestamp(high)
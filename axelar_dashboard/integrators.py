@@ -0,0 +1,201 @@
+"""Per-integrator statistics from one tagged event table.
+
+``axelar_integrator_events`` holds one row per (integrator, executed event) for every
+integrator in :data:`axelar_dashboard.events.INTEGRATORS`. Each integrator has its own
+watermark, named after a hash of its addresses, and integrators at the same watermark are
+tagged in a single pass over ``fact_transfers`` and ``fact_gmp``. An integrator that is new
+to the registry, or whose addresses changed, has no watermark under its new name: its rows,
+first-seen index and profiles are dropped and rebuilt from the full history in a pass of its
+own, after which it joins the shared pass. The first-seen index and the activity profiles of
+every integrator scope are built from the tagged rows.
+
+The query builders below return all integrators at once, with an ``Integrator`` column; a
+page loads them once and keeps its own integrator's rows with :func:`integrator_rows`.
+"""
+import hashlib
+
+import streamlit as st
+
+from axelar_dashboard.events import INTEGRATOR_EVENTS_TABLE, INTEGRATOR_SCOPES, INTEGRATORS, tagged_events_sql
+from axelar_dashboard.first_seen import FIRST_SEEN_TABLE, ensure_first_seen_table, refresh_first_seen
+from axelar_dashboard.incremental import (EPOCH, ensure_watermark_table, execute, read_watermark, refresh_window,
+                                          write_watermark)
+from axelar_dashboard.profiles import PROFILE_TABLE, ensure_profile_table, refresh_profiles
+
+REFRESH_TTL = 3600
+
+
+def ensure_integrator_events_table(conn):
+    execute(conn, f"""
+    CREATE TABLE IF NOT EXISTS {INTEGRATOR_EVENTS_TABLE} (
+        integrator STRING,
+        created_at TIMESTAMP_NTZ,
+        id STRING,
+        user STRING,
+        service STRING,
+        source_chain STRING,
+        destination_chain STRING,
+        amount_usd FLOAT,
+        raw_asset STRING
+    ) CLUSTER BY (integrator, TO_DATE(created_at))
+    """)
+
+
+def watermark_name(name):
+    """The integrator's watermark name; it changes whenever the integrator's addresses do."""
+    digest = hashlib.blake2b(repr(sorted(INTEGRATORS[name])).encode(), digest_size=8).hexdigest()
+    return f"{INTEGRATOR_EVENTS_TABLE}:{name}:{digest}"
+
+
+def reset_scope(conn, name):
+    """Forget what was derived from ``name``'s old tagging, so it is rebuilt from the full history."""
+    scope = name.lower()
+    execute(conn, f"DELETE FROM {INTEGRATOR_EVENTS_TABLE} WHERE integrator = '{name}'")
+    for table in (FIRST_SEEN_TABLE, PROFILE_TABLE):
+        execute(conn, f"DELETE FROM {table} WHERE scope = '{scope}'")
+        write_watermark(conn, f"{table}:{scope}", EPOCH)
+
+
+def refresh_integrator_events(conn):
+    """Tag the events since each integrator's watermark and return the watermarks by integrator."""
+    ensure_watermark_table(conn)
+    ensure_integrator_events_table(conn)
+    ensure_first_seen_table(conn)
+    ensure_profile_table(conn)
+    groups = {}
+    for name in INTEGRATORS:
+        groups.setdefault(read_watermark(conn, watermark_name(name)), []).append(name)
+
+    watermarks = {}
+    for watermark, names in groups.items():
+        source = tagged_events_sql(names)
+        since, high = refresh_window(conn, watermark_name(names[0]), source)
+        if high is None:
+            watermarks.update(dict.fromkeys(names, watermark))
+            continue
+        integrators = ", ".join(f"'{name}'" for name in names)
+        execute(conn, "BEGIN")
+        try:
+            if watermark == EPOCH:
+                for name in names:
+                    reset_scope(conn, name)
+            execute(conn, f"""
+            DELETE FROM {INTEGRATOR_EVENTS_TABLE}
+            WHERE integrator IN ({integrators}) AND created_at >= '{since:%Y-%m-%d %H:%M:%S}'
+            """)
+            execute(conn, f"""
+            INSERT INTO {INTEGRATOR_EVENTS_TABLE}
+                (integrator, created_at, id, user, service, source_chain, destination_chain, amount_usd, raw_asset)
+            SELECT integrator, created_at, id, user, service, source_chain, destination_chain, amount_usd, raw_asset
+            FROM ({source})
+            WHERE created_at >= '{since:%Y-%m-%d %H:%M:%S}' AND created_at <= '{high:%Y-%m-%d %H:%M:%S.%f}'
+            """)
+            for name in names:
+                write_watermark(conn, watermark_name(name), high)
+            execute(conn, "COMMIT")
+        except Exception:
+            execute(conn, "ROLLBACK")
+            raise
+        watermarks.update(dict.fromkeys(names, high))
+    return watermarks
+
+
+def refresh_integrators(conn):
+    """Refresh the tagged events, then every integrator's first-seen index and profiles."""
+    watermarks = list(refresh_integrator_events(conn).values())
+    for scope in INTEGRATOR_SCOPES:
+        watermarks += [refresh_first_seen(conn, scope), refresh_profiles(conn, scope)]
+    return watermarks
+
+
+@st.cache_data(ttl=REFRESH_TTL, show_spinner=False)
+def integrators_version(_conn):
+    return "|".join(str(watermark) for watermark in refresh_integrators(_conn))
+
+
+def integrator_rows(df, name, column="Integrator"):
+    """``name``'s rows of an all-integrator result, without the integrator column."""
+    return df[df[column] == name].drop(columns=column).reset_index(drop=True)
+
+
+def integrator_name_sql(column="scope"):
+    """SQL mapping an integrator scope back to the integrator's name."""
+    cases = " ".join(f"WHEN '{scope}' THEN '{name}'" for scope, name in INTEGRATOR_SCOPES.items())
+    return f"CASE {column} {cases} END"
+
+
+def integrator_kpis_query(start_str, end_str):
+    return f"""
+    SELECT
+        integrator AS "Integrator",
+        COUNT(DISTINCT id) AS "Total Number of Bridges",
+        COUNT(DISTINCT user) AS "Total Numebr of Users",
+        ROUND(SUM(amount_usd)) AS "Total Bridges Volume",
+        COUNT(DISTINCT raw_asset) AS "Number of Supported Tokens",
+        ROUND(MAX(amount_usd)) AS "Maximum Bridge Amount",
+        ROUND(AVG(amount_usd)) AS "Average Bridge Amount",
+        ROUND(MEDIAN(amount_usd)) AS "Median Bridge Amount",
+        COUNT(DISTINCT (source_chain || '➡' || destination_chain)) AS "Number of Unique Routes",
+        COUNT(DISTINCT source_chain) AS "Number of Source Chains",
+        COUNT(DISTINCT destination_chain) AS "Number of Destination Chains"
+    FROM {INTEGRATOR_EVENTS_TABLE}
+    WHERE created_at::date >= '{start_str}' AND created_at::date <= '{end_str}'
+    GROUP BY 1
+    """
+
+
+def integrator_routes_query(start_str, end_str):
+    return f"""
+    SELECT
+        integrator AS "Integrator",
+        source_chain || '➡' || destination_chain AS "Route",
+        ROUND(SUM(amount_usd)) AS "Volume",
+        ROUND(AVG(amount_usd), 1) AS "Avg Volume per Txn",
+        COUNT(DISTINCT id) AS "Bridges",
+        COUNT(DISTINCT user) AS "Bridgors",
+        ROUND(SUM(amount_usd) / COUNT(DISTINCT user), 1) AS "Avg Volume per Bridgor",
+        ROUND(COUNT(DISTINCT id) / COUNT(DISTINCT user)) AS "Avg Bridge Count per User"
+    FROM {INTEGRATOR_EVENTS_TABLE}
+    WHERE created_at::date >= '{start_str}' AND created_at::date <= '{end_str}'
+    GROUP BY 1, 2
+    ORDER BY 1, 5 DESC
+    """
+
+
+def integrator_bridgors_query(timeframe, start_str, end_str):
+    return f"""
+    WITH total AS (
+        SELECT integrator, date_trunc('{timeframe}', created_at) AS "Date", COUNT(DISTINCT user) AS "Total Bridgors"
+        FROM {INTEGRATOR_EVENTS_TABLE}
+        WHERE created_at::date >= '{start_str}' AND created_at::date <= '{end_str}'
+        GROUP BY 1, 2
+    ),
+    first_seen AS (
+        SELECT {integrator_name_sql()} AS integrator, date_trunc('{timeframe}', first_seen_at::date) AS "Date",
+            COUNT(DISTINCT user) AS "New Bridgors"
+        FROM {FIRST_SEEN_TABLE}
+        WHERE scope IN ({", ".join(f"'{scope}'" for scope in INTEGRATOR_SCOPES)})
+          AND first_seen_at::date >= '{start_str}' AND first_seen_at::date <= '{end_str}'
+        GROUP BY 1, 2
+    )
+    SELECT t.integrator AS "Integrator", t."Date" AS "Date", "Total Bridgors", "New Bridgors",
+        "Total Bridgors" - "New Bridgors" AS "Returning Bridgors",
+        SUM("New Bridgors") OVER (PARTITION BY t.integrator ORDER BY t."Date") AS "Bridgors Growth"
+    FROM total t
+    LEFT JOIN first_seen n ON t.integrator = n.integrator AND t."Date" = n."Date"
+    ORDER BY 1, 2
+    """
+
+
+def integrator_profiles_query(start_str, end_str):
+    """Per-user totals of every integrator over a date range, like :func:`axelar_dashboard.profiles.profile_range_query`."""
+    return f"""
+    SELECT {integrator_name_sql()} AS "Integrator",
+        SUM(tx_count) AS tx_count,
+        ARRAY_SIZE(ARRAY_UNION_AGG(paths)) AS path_count,
+        SUM(volume_usd) AS volume_usd
+    FROM {PROFILE_TABLE}
+    WHERE scope IN ({", ".join(f"'{scope}'" for scope in INTEGRATOR_SCOPES)})
+      AND date >= '{start_str}' AND date <= '{end_str}'
+    GROUP BY scope, user
+    """
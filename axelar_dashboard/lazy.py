@@ -0,0 +1,51 @@
+"""Deferred loading for below-the-fold dashboard sections.
+
+A lazy section is a fragment whose body starts with :func:`section_opened`: until the viewer
+switches the section on, only a placeholder is drawn and none of its loaders run. Opening it
+reruns just that fragment. Pages call :func:`prefetch` for the loaders of closed sections
+after everything visible has rendered; a single background worker then fills the
+loader caches one query at a time, so by the time a section is opened its data
+is usually already cached. If a viewer opens the section while its query is still queued,
+the viewer's call joins that query and moves it up to the viewer's priority
+(:mod:`axelar_dashboard.scheduler`), so the viewer never waits at prefetch priority.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from axelar_dashboard.shared import loader_name
+
+# -- one worker: prefetching never competes with itself for the warehouse
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+_pending = set()
+_lock = threading.Lock()
+
+
+def section_opened(label, key):
+    """Toggle gating a lazy section; draws the placeholder and returns False while it is off."""
+    opened = st.toggle(label, key=key)
+    if not opened:
+        st.caption("⏳ Not loaded yet: switch on to load this section.")
+    return opened
+
+
+def _run(key, load, args):
+    try:
+        load(*args)
+    except Exception:
+        # -- the section's own call will run the loader again and surface the error
+        pass
+    finally:
+        with _lock:
+            _pending.discard(key)
+
+
+def prefetch(load, *args):
+    """Queue ``load(*args)`` on the background worker unless the same call is already queued."""
+    key = (loader_name(load), repr(args))
+    with _lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+    _executor.submit(_run, key, load, args)
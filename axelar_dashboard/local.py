@@ -0,0 +1,135 @@
+"""Run the pages' Snowflake SQL against a local Parquet snapshot with DuckDB.
+
+:func:`local_connection` opens one in-process DuckDB database per snapshot directory (written
+by :mod:`axelar_dashboard.snapshot`) with views named like the Snowflake sources, e.g.
+``axelar.axelscan.fact_transfers``. Queries are translated from Snowflake SQL with sqlglot:
+
+- unquoted identifiers are upper-cased, so result columns come back named as Snowflake
+  returns them (DuckDB matches identifiers case-insensitively);
+- ``data:path`` variant access extracts JSON text, like Snowflake's implicit cast to string;
+- the Snowflake-only functions the pages use are DuckDB macros (:data:`MACROS`). HLL sketches
+  are exported as the distinct values themselves, which
+  :func:`axelar_dashboard.rollup.hll_registers` hashes into registers.
+
+The tables the dashboard maintains itself (first-seen index, profiles, Satellite matches) are
+built in the same database by the usual refresh code on first use, and are rebuilt when the
+process restarts.
+"""
+import functools
+import os
+import threading
+
+import duckdb
+import sqlglot
+from sqlglot import exp
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+
+from axelar_dashboard.snapshot import SNAPSHOT_TABLES
+
+MACROS = {
+    "is_array(x)": "CASE WHEN json_valid(x) THEN json_type(x::JSON) = 'ARRAY' ELSE false END",
+    "is_object(x)": "CASE WHEN json_valid(x) THEN json_type(x::JSON) = 'OBJECT' ELSE false END",
+    "try_to_double(x)": "TRY_CAST(x AS DOUBLE)",
+    "array_unique_agg(x)": "list_distinct(list(x))",
+    "array_union_agg(x)": "list_distinct(flatten(list(x)))",
+    "hll_accumulate(x)": "list_distinct(list(x::VARCHAR))",
+    "hll_export(s)": "to_json(s)",
+}
+
+_connections = {}
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1024)
+def translate(sql, placeholders=False):
+    """DuckDB SQL for one Snowflake statement; ``placeholders`` turns ``%s`` parameters into ``?``."""
+    sql = sql.strip().rstrip(";")
+    if placeholders:
+        sql = sql.replace("%s", "?")
+    tree = normalize_identifiers(sqlglot.parse_one(sql, read="snowflake"), dialect="snowflake")
+    for node in list(tree.find_all(exp.JSONExtract)):
+        node.replace(exp.JSONExtractScalar(this=node.this, expression=node.expression))
+    for node in list(tree.find_all(exp.Cluster)):
+        # -- clustering keys have no DuckDB counterpart
+        node.pop()
+    for node in tree.find_all(exp.DataType):
+        # -- untyped Snowflake ARRAY columns only ever hold strings here (path sets)
+        if node.this == exp.DataType.Type.ARRAY and not node.expressions:
+            node.set("expressions", [exp.DataType.build("VARCHAR")])
+            node.set("nested", True)
+    return tree.sql(dialect="duckdb", identify=True)
+
+
+class LocalCursor:
+    """The part of the Snowflake cursor API that :mod:`axelar_dashboard.incremental` uses."""
+
+    def __init__(self, duck):
+        self._duck = duck
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, sql, params=None):
+        self._duck.execute(translate(sql, params is not None), params)
+        self.description = self._duck.description
+        return self
+
+    def fetchall(self):
+        return self._duck.fetchall()
+
+    def close(self):
+        # -- the DuckDB cursor belongs to the thread (see LocalConnection._duck)
+        pass
+
+
+class LocalConnection:
+    def __init__(self, snapshot_dir):
+        self.snapshot_dir = snapshot_dir
+        self._db = duckdb.connect()
+        self._threads = threading.local()
+        catalogs = set()
+        for name, (source, _, columns) in SNAPSHOT_TABLES.items():
+            catalog, schema, table = source.split(".")
+            if catalog not in catalogs:
+                self._db.execute(f"ATTACH ':memory:' AS {catalog}")
+                catalogs.add(catalog)
+            self._db.execute(f"CREATE SCHEMA IF NOT EXISTS {catalog}.{schema}")
+            files = os.path.join(snapshot_dir, name, "*", "*.parquet").replace("'", "''")
+            # -- VARIANT columns were exported as JSON text
+            replace = " REPLACE (data::JSON AS data)" if "TO_JSON(data) AS data" in columns else ""
+            self._db.execute(f"""
+            CREATE VIEW {catalog}.{schema}.{table} AS
+            SELECT *{replace} FROM read_parquet('{files}', hive_partitioning = false)
+            """)
+        for signature, body in MACROS.items():
+            self._db.execute(f"CREATE MACRO {signature} AS {body}")
+
+    def _duck(self):
+        # -- one DuckDB cursor per thread, so BEGIN ... COMMIT issued through separate
+        # -- cursor() calls stays in one transaction, as in a Snowflake session
+        duck = getattr(self._threads, "duck", None)
+        if duck is None:
+            duck = self._threads.duck = self._db.cursor()
+        return duck
+
+    def cursor(self):
+        return LocalCursor(self._duck())
+
+    def read_frame(self, query):
+        return self._duck().execute(translate(query)).df()
+
+    def close(self):
+        pass
+
+
+def local_connection(snapshot_dir):
+    """The process-wide connection for ``snapshot_dir`` (derived tables live in it)."""
+    with _lock:
+        conn = _connections.get(snapshot_dir)
+        if conn is None:
+            conn = _connections[snapshot_dir] = LocalConnection(snapshot_dir)
+    return conn
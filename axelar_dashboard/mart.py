@@ -0,0 +1,303 @@
+"""Precomputed loader results (the mart) built by ``python -m axelar_dashboard.build_mart``.
+
+A subject is a loader query whose result for any date range is a slice of its full-history
+result: a day-grain series (one row per day and key) or a fixed aggregate without a date
+range. Page loaders call :func:`load_subject`, which reads the mart when ``AXELAR_MART_DIR``
+is set and its current version covers the requested range, and otherwise runs the subject's
+query through :func:`axelar_dashboard.db.read_sql`.
+
+Layout under the mart directory: ``versions/<version>/<subject>/month=YYYY-MM.parquet`` for
+dated subjects (``data.parquet`` otherwise), a ``manifest.json`` per version with each
+subject's covered range, and ``CURRENT`` naming the complete version readers use.
+
+Loaders served from the mart take :func:`mart_version` as an argument, so their cached
+results are keyed by the version they were read from and a nightly swap of ``CURRENT`` is
+picked up on the next rerun.
+
+KPI cards and tracking tables are not subjects. They report exact distinct users, routes
+and tokens (and medians) over the selected range, per path or chain for the tracking
+tables. Those cannot be assembled from per-day or per-month rows: summing daily distinct
+counts over-counts, and the HLL sketches the time series merge are approximate, which the
+exact figures on the cards and tables must not be. So they keep querying the warehouse.
+"""
+import json
+import os
+
+import pandas as pd
+
+from axelar_dashboard.db import read_sql
+from axelar_dashboard.events import INTEGRATOR_EVENTS_TABLE
+from axelar_dashboard.first_seen import FIRST_SEEN_TABLE
+from axelar_dashboard.integrators import refresh_integrators
+from axelar_dashboard.satellite import SATELLITE_TABLE, refresh_satellite
+from axelar_dashboard.scheduler import CHART, TABLE
+
+MART_DIR = os.environ.get("AXELAR_MART_DIR", "")
+
+SUBJECTS = {}
+
+
+def subject(name, date_column="Date", priority=CHART, refresh=None):
+    """Register a query builder as mart subject ``name``.
+
+    Dated subjects take ``(start_str, end_str)``; undated ones (``date_column=None``) take no
+    arguments. ``refresh(conn)`` brings a derived table the query reads up to date.
+    """
+    def register(build_sql):
+        SUBJECTS[name] = {"sql": build_sql, "date_column": date_column, "priority": priority, "refresh": refresh}
+        return build_sql
+    return register
+
+
+@subject("overview_stats_daily")
+def overview_stats_daily(start_str, end_str):
+    return f"""
+    WITH axelar_service AS (
+  SELECT 
+    created_at, 
+    LOWER(data:send:original_source_chain) AS source_chain, 
+    LOWER(data:send:original_destination_chain) AS destination_chain,
+    sender_address AS user, case 
+      WHEN IS_ARRAY(data:send:fee_value) THEN NULL
+      WHEN IS_OBJECT(data:send:fee_value) THEN NULL
+      WHEN TRY_TO_DOUBLE(data:send:fee_value::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:send:fee_value::STRING)
+      ELSE NULL END AS fee, 'Token Transfers' as "Service"
+  FROM axelar.axelscan.fact_transfers
+  WHERE status = 'executed' AND simplified_status = 'received'
+
+  UNION ALL
+
+  SELECT  
+    created_at,
+    LOWER(data:call.chain::STRING) AS source_chain,
+    LOWER(data:call.returnValues.destinationChain::STRING) AS destination_chain,
+    data:call.transaction.from::STRING AS user, COALESCE( CASE 
+        WHEN IS_ARRAY(data:gas:gas_used_amount) OR IS_OBJECT(data:gas:gas_used_amount) 
+          OR IS_ARRAY(data:gas_price_rate:source_token.token_price.usd) OR    IS_OBJECT(data:gas_price_rate:source_token.token_price.usd) 
+        THEN NULL
+        WHEN TRY_TO_DOUBLE(data:gas:gas_used_amount::STRING) IS NOT NULL 
+          AND TRY_TO_DOUBLE(data:gas_price_rate:source_token.token_price.usd::STRING) IS NOT NULL 
+        THEN TRY_TO_DOUBLE(data:gas:gas_used_amount::STRING) * TRY_TO_DOUBLE(data:gas_price_rate:source_token.token_price.usd::STRING)
+        ELSE NULL END, CASE 
+        WHEN IS_ARRAY(data:fees:express_fee_usd) OR IS_OBJECT(data:fees:express_fee_usd) THEN NULL
+        WHEN TRY_TO_DOUBLE(data:fees:express_fee_usd::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:fees:express_fee_usd::STRING)
+        ELSE NULL END) AS fee, 'GMP' as "Service"
+  FROM axelar.axelscan.fact_gmp 
+  WHERE status = 'executed' AND simplified_status = 'received')
+
+SELECT created_at::date as "Date", "Service", count(distinct user) as "Number of Users", 
+HLL_EXPORT(HLL_ACCUMULATE(user)) as "Users Sketch", sum(fee) as "Total Gas Fees",
+ARRAY_UNIQUE_AGG(source_chain || '➡' || destination_chain) as "Paths"
+FROM axelar_service
+where created_at::date>='{start_str}' and created_at::date<='{end_str}'
+group by 1, 2
+order by 1
+
+    """
+
+
+@subject("its_deployed_tokens_daily")
+def its_deployed_tokens_daily(start_str, end_str):
+    return f"""
+    SELECT created_at::date as "Date", ARRAY_UNIQUE_AGG(data:interchain_token_deployment_started:tokenId::STRING) as "Token Ids"
+FROM axelar.axelscan.fact_gmp 
+WHERE status = 'executed' AND simplified_status = 'received' AND (
+data:approved:returnValues:contractAddress ilike '%0xB5FB4BE02232B1bBA4dC8f81dc24C26980dE9e3C%' -- Interchain Token Service
+or data:approved:returnValues:contractAddress ilike '%axelar1aqcj54lzz0rk22gvqgcn8fr5tx4rzwdv5wv5j9dmnacgefvd7wzsy2j2mr%' -- Axelar ITS Hub
+) AND data:interchain_token_deployment_started:event='InterchainTokenDeploymentStarted'
+AND created_at::date>='{start_str}' and created_at::date<='{end_str}'
+group by 1
+order by 1
+
+    """
+
+
+@subject("integrator_bridges_daily", refresh=refresh_integrators)
+def integrator_bridges_daily(start_str, end_str):
+    return f"""
+    SELECT 
+        created_at::date as "Date",
+        integrator as "Integrator",
+        count(distinct id) as "Bridges", 
+        sum(amount_usd) as "Bridge Amount",
+        count(distinct user) as "Users",
+        HLL_EXPORT(HLL_ACCUMULATE(user)) as "Users Sketch"
+    FROM {INTEGRATOR_EVENTS_TABLE}
+    WHERE created_at::date >= '{start_str}'
+      AND created_at::date <= '{end_str}'
+    GROUP BY 1, 2
+    ORDER BY 1
+    """
+
+
+@subject("integrator_bridge_volume_daily", refresh=refresh_integrators)
+def integrator_bridge_volume_daily(start_str, end_str):
+    return f"""
+    with bridges as (
+SELECT integrator, created_at, id, user, amount_usd
+FROM {INTEGRATOR_EVENTS_TABLE}
+where created_at::date>='{start_str}' and created_at::date<='{end_str}')
+
+select 
+  created_at::date as "Date",
+  integrator as "Integrator",
+  case when b.user is not null then 'New Users'
+  else 'Returning Users' end as "User Status",
+  sum(amount_usd) as "Bridge Amount"
+from bridges a left join {FIRST_SEEN_TABLE} b
+  on b.scope = lower(a.integrator) and a.user = b.user and a.created_at = b.first_seen_at
+group by 1,2,3
+order by 1
+    """
+
+
+@subject("satellite_daily", date_column="DATE", refresh=refresh_satellite)
+def satellite_daily(start_str, end_str):
+    return f"""
+    SELECT 
+      date,
+      COUNT(DISTINCT tx_hash) AS transfers, 
+      COUNT(DISTINCT sender) AS users,
+      HLL_EXPORT(HLL_ACCUMULATE(sender)) AS users_sketch,
+      SUM(amount_usd) AS volume_usd,
+      COUNT(amount_usd) AS priced_transfers
+    FROM {SATELLITE_TABLE}
+    WHERE date >= '{start_str}' AND date <= '{end_str}'
+    GROUP BY 1
+    ORDER BY 1;
+    """
+
+
+@subject("gmp_event_txns", date_column=None, priority=TABLE)
+def gmp_event_txns():
+    return """
+    with tab1 as (
+select event, id, data:call.transaction.from::STRING as user, CASE 
+      WHEN IS_ARRAY(data:value) OR IS_OBJECT(data:value) THEN NULL
+      WHEN TRY_TO_DOUBLE(data:value::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:value::STRING)
+      ELSE NULL
+    END AS amount_usd
+from axelar.axelscan.fact_gmp)
+select event as "Event", count(distinct id) as "Txns count"
+from tab1
+group by 1
+order by 2 desc 
+
+    """
+
+
+@subject("gmp_event_routes", date_column=None, priority=TABLE)
+def gmp_event_routes():
+    return """
+    with tab1 as (
+select event, id, data:call.transaction.from::STRING as user, CASE 
+      WHEN IS_ARRAY(data:value) OR IS_OBJECT(data:value) THEN NULL
+      WHEN TRY_TO_DOUBLE(data:value::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:value::STRING)
+      ELSE NULL
+    END AS amount_usd,
+    LOWER(data:call.chain::STRING) AS source_chain,
+    LOWER(data:call.returnValues.destinationChain::STRING) AS destination_chain
+from axelar.axelscan.fact_gmp)
+
+select source_chain || '➡' || destination_chain as "Route", 
+count(distinct id) as "🔗Txns count", 
+count(distinct user) as "👥Users Count", 
+round(sum(amount_usd),1) as "💸Txns Value (USD)"
+from tab1
+where event in ('ContractCall','ContractCallWithToken')
+group by 1
+order by 2 desc 
+
+    """
+
+
+@subject("gmp_events_monthly", date_column=None)
+def gmp_events_monthly():
+    return """
+    with tab1 as (
+select created_at, event, id, data:call.transaction.from::STRING as user, CASE 
+      WHEN IS_ARRAY(data:value) OR IS_OBJECT(data:value) THEN NULL
+      WHEN TRY_TO_DOUBLE(data:value::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:value::STRING)
+      ELSE NULL
+    END AS amount_usd,
+    LOWER(data:call.chain::STRING) AS source_chain,
+    LOWER(data:call.returnValues.destinationChain::STRING) AS destination_chain
+from axelar.axelscan.fact_gmp)
+
+select date_trunc('month',created_at) as "Date", event as "Event", count(distinct id) as "Txns Count", round(sum(amount_usd),1) as "Txns Value (USD)"
+from tab1
+where event in ('ContractCall','ContractCallWithToken') and created_at::date>='2023-01-01'
+group by 1, 2
+order by 1
+    """
+
+
+def version_dir(mart_dir, version):
+    return os.path.join(mart_dir, "versions", version)
+
+
+def partition_path(root, name, month=None):
+    if month is None:
+        return os.path.join(root, name, "data.parquet")
+    return os.path.join(root, name, f"month={month:%Y-%m}.parquet")
+
+
+def current_version(mart_dir=MART_DIR):
+    try:
+        with open(os.path.join(mart_dir, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def mart_version(mart_dir=MART_DIR):
+    """The mart version loaders read, or None without a mart."""
+    return current_version(mart_dir) if mart_dir else None
+
+
+def read_manifest(mart_dir, version):
+    with open(os.path.join(version_dir(mart_dir, version), "manifest.json")) as f:
+        return json.load(f)
+
+
+def read_mart(name, start_date=None, end_date=None, mart_dir=MART_DIR):
+    """Rows of subject ``name`` from the current mart version, or None when it cannot answer."""
+    version = mart_version(mart_dir)
+    if version is None:
+        return None
+    entry = read_manifest(mart_dir, version)["subjects"].get(name)
+    if entry is None:
+        return None
+    root = version_dir(mart_dir, version)
+    date_column = SUBJECTS[name]["date_column"]
+    if date_column is None:
+        return pd.read_parquet(partition_path(root, name))
+
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if start < pd.Timestamp(entry["start"]) or end > pd.Timestamp(entry["end"]):
+        return None
+    parts = []
+    for month in pd.period_range(start, end, freq="M"):
+        path = partition_path(root, name, month)
+        if os.path.exists(path):
+            parts.append(pd.read_parquet(path))
+    if not parts:
+        return pd.DataFrame(columns=entry["columns"])
+    df = pd.concat(parts, ignore_index=True)
+    dates = pd.to_datetime(df[date_column])
+    return df[(dates >= start) & (dates <= end)].reset_index(drop=True)
+
+
+def subject_query(name, start_date=None, end_date=None):
+    spec = SUBJECTS[name]
+    if spec["date_column"] is None:
+        return spec["sql"]()
+    return spec["sql"](pd.Timestamp(start_date).strftime("%Y-%m-%d"), pd.Timestamp(end_date).strftime("%Y-%m-%d"))
+
+
+def load_subject(name, conn, start_date=None, end_date=None):
+    """Subject ``name`` for ``start_date``..``end_date``: from the mart if it covers the range, else the warehouse."""
+    df = read_mart(name, start_date, end_date)
+    if df is not None:
+        return df
+    return read_sql(subject_query(name, start_date, end_date), conn, SUBJECTS[name]["priority"])
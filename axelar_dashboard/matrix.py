@@ -0,0 +1,77 @@
+"""Source x destination chain matrices built from path aggregates.
+
+:meth:`PathMatrix.from_paths` scatters the rows of a path table compacted by
+:func:`axelar_dashboard.schema.compact` into one dense ``(source, destination)`` array per
+measure, indexed by the process-wide chain ids, so no path label is parsed. Transfers,
+volume and fees add up over paths, so a chain's totals as a source or a destination are the
+matrix's row and column sums. Distinct counts such as users do not add up and are not kept.
+A few hundred chains fit in a dense array, so no sparse format is needed.
+"""
+import numpy as np
+import pandas as pd
+
+from axelar_dashboard.schema import DST_SUFFIX, SRC_SUFFIX, chains
+
+NORMALIZATIONS = (None, "rows", "columns", "total")
+
+
+class PathMatrix:
+    """Immutable once built; loaders may cache and share it."""
+
+    def __init__(self, values, names):
+        self.values = values
+        self.names = names
+
+    @classmethod
+    def from_paths(cls, df, path_column, measures):
+        """``measures`` maps a measure name to the column of ``df`` holding it."""
+        names = chains.names()
+        src = df[path_column + SRC_SUFFIX].to_numpy(dtype="int64")
+        dst = df[path_column + DST_SUFFIX].to_numpy(dtype="int64")
+        # -- rows with a missing chain (id -1) are left out
+        valid = (src >= 0) & (dst >= 0)
+        values = {}
+        for measure, column in measures.items():
+            matrix = np.zeros((len(names), len(names)))
+            np.add.at(matrix, (src[valid], dst[valid]), np.nan_to_num(df[column].to_numpy(dtype="float64")[valid]))
+            values[measure] = matrix
+        return cls(values, names)
+
+    def row_sums(self, measure):
+        """Totals per source chain."""
+        return pd.Series(self.values[measure].sum(axis=1), index=self.names, name=measure)
+
+    def column_sums(self, measure):
+        """Totals per destination chain."""
+        return pd.Series(self.values[measure].sum(axis=0), index=self.names, name=measure)
+
+    def normalized(self, measure, by=None):
+        """The matrix as shares of each row's, each column's or the overall total (``by`` in :data:`NORMALIZATIONS`)."""
+        matrix = self.values[measure]
+        if by is None:
+            return matrix
+        if by == "rows":
+            totals = matrix.sum(axis=1, keepdims=True)
+        elif by == "columns":
+            totals = matrix.sum(axis=0, keepdims=True)
+        elif by == "total":
+            totals = matrix.sum()
+        else:
+            raise ValueError(f"Unknown normalization: {by}")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(totals > 0, matrix / totals, 0.0)
+
+    def order(self, measure, top=None):
+        """Chain indices by total flow (out + in), busiest first, without chains that have none."""
+        matrix = self.values[measure]
+        totals = matrix.sum(axis=0) + matrix.sum(axis=1)
+        order = np.argsort(-totals, kind="stable")
+        order = order[totals[order] > 0]
+        return order if top is None else order[:top]
+
+    def frame(self, measure, by=None, top=None):
+        """Source x destination DataFrame of the ``top`` busiest chains, ordered by total flow."""
+        order = self.order(measure, top)
+        labels = [self.names[i] for i in order]
+        matrix = self.normalized(measure, by)[np.ix_(order, order)]
+        return pd.DataFrame(matrix, index=pd.Index(labels, name="Source"), columns=pd.Index(labels, name="Destination"))
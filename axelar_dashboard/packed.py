@@ -0,0 +1,136 @@
+"""Compressed frames for the loader caches.
+
+A :class:`PackedFrame` holds a DataFrame as one Arrow IPC file in memory, with every column
+buffer compressed with zstd (``AXELAR_CACHE_COMPRESSION=lz4`` picks lz4, ``none`` turns
+packing off). Columns are decompressed when read, and :meth:`PackedFrame.frame` reads only
+the columns asked for. :func:`pack` packs frames of at least ``AXELAR_CACHE_COMPRESS_KB`` (default 256) and leaves
+smaller frames, and frames Arrow cannot represent, as they are; :func:`unpack` is its
+inverse. ``python -m axelar_dashboard.bench_cache`` compares size and decode time against
+the pickled frames ``st.cache_data`` keeps.
+
+Decoding a whole frame on every cache hit would cost O(rows) and a full copy per viewer and
+rerun, so the most recently read frames are also kept decoded, up to ``DECODED_CACHE_MB``
+(``AXELAR_CACHE_DECODED_MB``, default 64) in total. :meth:`PackedFrame.frame` hands out
+``copy(deep=False)`` views of the decoded frame; they are safe to share under pandas
+copy-on-write, which :mod:`axelar_dashboard.shared` turns on. The loader cache reserves this
+amount out of its own budget, so decoded copies are counted.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+
+from axelar_dashboard.schema import frame_bytes
+
+COMPRESSION = os.environ.get("AXELAR_CACHE_COMPRESSION", "zstd")
+COMPRESS_MIN_BYTES = int(float(os.environ.get("AXELAR_CACHE_COMPRESS_KB", "256")) * 1024)
+DECODED_CACHE_MB = float(os.environ.get("AXELAR_CACHE_DECODED_MB", "64"))
+
+# -- packed frames currently holding a decoded copy, least recently read first
+_decoded = OrderedDict()
+_decoded_bytes = 0
+_lock = threading.Lock()
+_stats = {"hits": 0, "decodes": 0}
+
+
+class PackedFrame:
+    def __init__(self, buffer, columns, raw_bytes):
+        self.buffer = buffer
+        self.columns = columns
+        self.raw_bytes = raw_bytes
+        self._frame = None
+
+    @classmethod
+    def from_frame(cls, df, compression=COMPRESSION):
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return cls(sink.getvalue(), list(df.columns), frame_bytes(df))
+
+    @property
+    def nbytes(self):
+        return self.buffer.size
+
+    def decode(self, columns=None):
+        """Decode the frame, or only ``columns`` of it; other columns are not decompressed."""
+        options = None
+        if columns is not None:
+            schema = pa.ipc.open_file(self.buffer).schema
+            # -- a non-range index is stored as columns of its own
+            index = [name for name in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(name, str)]
+            options = pa.ipc.IpcReadOptions(included_fields=[schema.get_field_index(name) for name in [*index, *columns]])
+        return pa.ipc.open_file(self.buffer, options=options).read_all().to_pandas()
+
+    def frame(self, columns=None):
+        """A view of the frame (or of ``columns``), from the decoded copy when there is one."""
+        with _lock:
+            df = self._frame
+            if df is not None:
+                _decoded.move_to_end(id(self))
+                _stats["hits"] += 1
+        if df is None:
+            if columns is not None:
+                return self.decode(columns)
+            df = self.decode()
+            with _lock:
+                _stats["decodes"] += 1
+            self.remember(df)
+        return (df if columns is None else df[columns]).copy(deep=False)
+
+    def remember(self, df):
+        """Keep ``df`` as the decoded copy, evicting the least recently read ones to stay in budget."""
+        global _decoded_bytes
+        budget = DECODED_CACHE_MB * (1 << 20)
+        if self.raw_bytes > budget:
+            return
+        with _lock:
+            if self._frame is not None:
+                return
+            while _decoded and _decoded_bytes + self.raw_bytes > budget:
+                _, evicted = _decoded.popitem(last=False)
+                _decoded_bytes -= evicted.raw_bytes
+                evicted._frame = None
+            self._frame = df
+            _decoded[id(self)] = self
+            _decoded_bytes += self.raw_bytes
+
+    def release(self):
+        """Drop the decoded copy; the caches call this when they drop the packed frame."""
+        global _decoded_bytes
+        with _lock:
+            if _decoded.pop(id(self), None) is not None:
+                _decoded_bytes -= self.raw_bytes
+                self._frame = None
+
+
+def pack(value):
+    if not isinstance(value, pd.DataFrame) or COMPRESSION == "none" or frame_bytes(value) < COMPRESS_MIN_BYTES:
+        return value
+    if not all(isinstance(column, str) for column in value.columns):
+        return value
+    try:
+        packed = PackedFrame.from_frame(value)
+    except (pa.ArrowException, TypeError, ValueError):
+        # -- mixed-type object columns stay uncompressed
+        return value
+    # -- a result just loaded is the one most likely to be read next
+    packed.remember(value)
+    return packed
+
+
+def unpack(value):
+    return value.frame() if isinstance(value, PackedFrame) else value
+
+
+def release(value):
+    if isinstance(value, PackedFrame):
+        value.release()
+
+
+def decoded_stats():
+    with _lock:
+        return dict(_stats, frames=len(_decoded), bytes=_decoded_bytes, budget_bytes=int(DECODED_CACHE_MB * (1 << 20)))
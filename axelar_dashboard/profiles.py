@@ -0,0 +1,111 @@
+"""Per-user, per-day activity profiles.
+
+``axelar_user_daily_profile`` holds one row per (scope, user, day) with the number of
+transactions, the set of source➡destination paths used and the USD volume. Days from the
+watermark (minus the lookback) onwards are rebuilt on each refresh. Distribution charts
+collapse the selected range to one row per user and bucket the counts locally, so class
+boundaries can change without another query.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from axelar_dashboard.events import events_sql
+from axelar_dashboard.incremental import execute, read_watermark, refresh_window, write_watermark
+
+PROFILE_TABLE = "axelar_user_daily_profile"
+REFRESH_TTL = 3600
+
+
+def ensure_profile_table(conn):
+    execute(conn, f"""
+    CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} (
+        scope STRING,
+        user STRING,
+        date DATE,
+        tx_count NUMBER,
+        paths ARRAY,
+        volume_usd FLOAT
+    ) CLUSTER BY (scope, date)
+    """)
+
+
+def refresh_profiles(conn, scope):
+    """Rebuild the profile days touched since the watermark and return the new watermark."""
+    ensure_profile_table(conn)
+    name = f"{PROFILE_TABLE}:{scope}"
+    source = events_sql(scope)
+    since, high = refresh_window(conn, name, source)
+    if high is None:
+        return read_watermark(conn, name)
+
+    since_day = since.strftime("%Y-%m-%d")
+    execute(conn, "BEGIN")
+    try:
+        execute(conn, f"DELETE FROM {PROFILE_TABLE} WHERE scope = '{scope}' AND date >= '{since_day}'")
+        execute(conn, f"""
+        INSERT INTO {PROFILE_TABLE} (scope, user, date, tx_count, paths, volume_usd)
+        SELECT '{scope}', user, created_at::date,
+            COUNT(DISTINCT id),
+            ARRAY_UNIQUE_AGG(source_chain || '➡' || destination_chain),
+            SUM(amount_usd)
+        FROM ({source})
+        WHERE created_at::date >= '{since_day}' AND created_at <= '{high:%Y-%m-%d %H:%M:%S.%f}'
+          AND user IS NOT NULL
+        GROUP BY user, created_at::date
+        """)
+        write_watermark(conn, name, high)
+        execute(conn, "COMMIT")
+    except Exception:
+        execute(conn, "ROLLBACK")
+        raise
+    return high
+
+
+@st.cache_data(ttl=REFRESH_TTL, show_spinner=False)
+def profile_version(_conn, scope):
+    return str(refresh_profiles(_conn, scope))
+
+
+def profile_range_query(scope, start_str, end_str):
+    """Per-user totals over a date range; user ids are not returned, only the measures."""
+    return f"""
+    SELECT SUM(tx_count) AS tx_count,
+        ARRAY_SIZE(ARRAY_UNION_AGG(paths)) AS path_count,
+        SUM(volume_usd) AS volume_usd
+    FROM {PROFILE_TABLE}
+    WHERE scope = '{scope}' AND date >= '{start_str}' AND date <= '{end_str}'
+    GROUP BY user
+    """
+
+
+def parse_bounds(text, default):
+    """``"1, 5, 10, 20"`` -> ``[1, 5, 10, 20]``; falls back to ``default`` on invalid input."""
+    try:
+        bounds = sorted({int(part) for part in text.replace(" ", "").split(",") if part})
+    except ValueError:
+        return default
+    return [bound for bound in bounds if bound >= 1] or default
+
+
+def range_labels(bounds, unit):
+    """Class labels for inclusive upper ``bounds``: ``1 Path``, ``2-5 Paths``, ..., ``>20 Paths``."""
+    labels, low = [], 1
+    for bound in bounds:
+        if bound == low:
+            labels.append(f"{bound} {unit}" if bound == 1 else f"{bound} {unit}s")
+        else:
+            labels.append(f"{low}-{bound} {unit}s")
+        low = bound + 1
+    labels.append(f">{bounds[-1]} {unit}s")
+    return labels
+
+
+def bucketize(values, bounds, labels, minimum=1):
+    """Count values per class, where class ``i`` holds ``bounds[i-1] < v <= bounds[i]``."""
+    values = np.asarray(values, dtype="float64")
+    values = values[values >= minimum]
+    idx = np.searchsorted(np.asarray(bounds, dtype="float64"), values, side="left")
+    counts = np.bincount(idx, minlength=len(labels))
+    df = pd.DataFrame({"Class": labels, "Number of Users": counts})
+    return df[df["Number of Users"] > 0].sort_values("Number of Users", ascending=False)
@@ -0,0 +1,122 @@
+"""Answer narrower date ranges from a cached wider time-series result.
+
+Time-series loaders take ``start_date``, ``end_date`` and optionally ``timeframe`` (day
+when absent) and return one row per ``date_trunc(timeframe)`` period. :func:`range_cache`
+remembers each result by loader, timeframe and the remaining arguments; a later call whose
+range lies inside a remembered one is answered by slicing those rows instead of querying
+the warehouse. Running totals (``sum(...) over (order by "Date")``) restart at the range
+start, so they are recomputed on the slice.
+
+A sliced period is only exact when the requested range covers it the same way the cached
+range did. The first and last periods are reused only if the requested start/end falls on
+a period boundary or equals the cached start/end; otherwise the call goes to the loader.
+Non-additive KPIs (distinct counts over the whole range, medians) are not wrapped.
+Large remembered results are kept compressed (:func:`axelar_dashboard.packed.pack`). The
+results live in the shared loader cache (:func:`axelar_dashboard.shared.cache_put`), under
+its byte budget; this module only keeps an index of the ranges remembered per loader.
+"""
+import datetime
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from axelar_dashboard.packed import pack, unpack
+from axelar_dashboard.shared import cache_get, cache_put, loader_name
+
+# -- index entries only: the results themselves are bounded by the shared cache budget
+MAX_RANGES = 1024
+
+_ranges = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _period_start(day, timeframe):
+    if timeframe == "month":
+        return day.replace(day=1)
+    if timeframe == "week":
+        # -- Snowflake's default WEEK_START: weeks begin on Monday
+        return day - datetime.timedelta(days=day.weekday())
+    return day
+
+
+def _covers(cached_start, cached_end, start, end, timeframe):
+    if not (cached_start <= start and end <= cached_end):
+        return False
+    first_ok = start == cached_start or _period_start(start, timeframe) == start
+    after_end = end + datetime.timedelta(days=1)
+    last_ok = end == cached_end or _period_start(after_end, timeframe) == after_end
+    return first_ok and last_ok
+
+
+def _as_date(value):
+    return pd.Timestamp(value).date()
+
+
+def range_cache(date_column="Date", cumulative=None):
+    """Decorate a time-series loader; ``cumulative`` maps running-total columns to their source."""
+    cumulative = cumulative or {}
+
+    def decorate(load):
+        signature = inspect.signature(load)
+        loader_id = f"{loader_name(load)} [range]"
+
+        @functools.wraps(load)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            # -- day-grain loaders (see axelar_dashboard.rollup) take no timeframe
+            timeframe = params.pop("timeframe", "day")
+            start, end = _as_date(params.pop("start_date")), _as_date(params.pop("end_date"))
+            # -- underscore arguments (connections) are not part of the result's identity
+            rest = tuple((name, repr(value)) for name, value in params.items() if not name.startswith("_"))
+            group = (loader_id, timeframe, rest)
+
+            with _lock:
+                candidates = [(key, cached_start, cached_end) for key, cached_start, cached_end in _ranges
+                              if key == group and _covers(cached_start, cached_end, start, end, timeframe)]
+            for entry in candidates:
+                _, cached_start, cached_end = entry
+                df = cache_get(group + (cached_start, cached_end))
+                with _lock:
+                    if df is None:
+                        # -- evicted from the shared cache
+                        _ranges.pop(entry, None)
+                        continue
+                    if entry in _ranges:
+                        _ranges.move_to_end(entry)
+                    _stats["hits"] += 1
+                return _slice(unpack(df), date_column, start, end, timeframe, cumulative)
+
+            df = load(*args, **kwargs)
+            cache_put(group + (start, end), pack(df))
+            with _lock:
+                _stats["misses"] += 1
+                _ranges[(group, start, end)] = None
+                _ranges.move_to_end((group, start, end))
+                while len(_ranges) > MAX_RANGES:
+                    _ranges.popitem(last=False)
+            return df.copy()
+
+        return wrapper
+
+    return decorate
+
+
+def _slice(df, date_column, start, end, timeframe, cumulative):
+    dates = pd.to_datetime(df[date_column])
+    low = pd.Timestamp(_period_start(start, timeframe))
+    high = pd.Timestamp(end) + pd.Timedelta(days=1)
+    part = df[(dates >= low) & (dates < high)].copy()
+    for total, source in cumulative.items():
+        part[total] = part[source].cumsum()
+    return part.reset_index(drop=True)
+
+
+def range_cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_ranges))
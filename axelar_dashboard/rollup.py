@@ -0,0 +1,112 @@
+"""Roll day-grain loader results up to week/month locally.
+
+Time-series loaders fetch one row per day (per key) once; :func:`roll_up` derives the
+``timeframe`` the page asks for, so toggling Day/Week/Month never reaches the warehouse.
+Additive measures are summed. Distinct counts cannot be summed across days, so each day
+also carries a mergeable summary of the distinct values:
+
+- high-cardinality values (users) as a HyperLogLog sketch, ``HLL_EXPORT(HLL_ACCUMULATE(x))``;
+  sketches merge by register-wise max and are estimated per period (about 1.6% error);
+- low-cardinality values (paths, token ids) as the exact set, ``ARRAY_UNIQUE_AGG(x)``.
+
+At day grain the exact daily ``COUNT(DISTINCT ...)`` column is used instead of the sketch.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 12
+REGISTERS = 1 << HLL_PRECISION
+
+
+def hll_registers(export):
+    """Register array of one ``HLL_EXPORT`` object (a JSON string or an already-parsed dict)."""
+    registers = np.zeros(REGISTERS, dtype=np.uint8)
+    if export is None or (isinstance(export, float) and np.isnan(export)):
+        return registers
+    if isinstance(export, str):
+        export = json.loads(export)
+    if isinstance(export, list):
+        # -- the local DuckDB backend exports the distinct values themselves (axelar_dashboard.local)
+        for value in export:
+            digest = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+            index, rest = digest >> (64 - HLL_PRECISION), digest & ((1 << (64 - HLL_PRECISION)) - 1)
+            registers[index] = max(registers[index], 64 - HLL_PRECISION - rest.bit_length() + 1)
+        return registers
+    if export.get("precision", HLL_PRECISION) != HLL_PRECISION:
+        raise ValueError(f"unexpected HLL precision {export.get('precision')}")
+    # -- register values are the position of the leftmost 1-bit; 0 means empty
+    if "dense" in export:
+        registers[:] = export["dense"]
+    else:
+        sparse = export.get("sparse", {})
+        registers[np.asarray(sparse.get("indices", []), dtype=np.int64)] = sparse.get("maxLzCounts", [])
+    return registers
+
+
+def hll_estimate(registers):
+    """Cardinality estimate for each row of a ``(n, REGISTERS)`` register matrix."""
+    registers = np.atleast_2d(registers)
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.exp2(-registers.astype("float64")).sum(axis=1)
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    # -- linear counting for small cardinalities
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+def parse_array(value):
+    """``ARRAY_UNIQUE_AGG`` values arrive from the Snowflake connector as JSON text."""
+    if isinstance(value, str):
+        return json.loads(value)
+    # -- the local DuckDB backend returns lists as arrays
+    return list(value) if isinstance(value, (list, np.ndarray)) else []
+
+
+def period_start(dates, timeframe):
+    """``date_trunc(timeframe, date)`` for a Series of dates (weeks start on Monday)."""
+    dates = pd.to_datetime(dates)
+    if timeframe == "month":
+        return dates.dt.to_period("M").dt.start_time
+    if timeframe == "week":
+        return dates.dt.to_period("W").dt.start_time
+    return dates.dt.normalize()
+
+
+def roll_up(daily, timeframe, date_column="Date", keys=(), sums=(), sketches=None, sets=None):
+    """Aggregate ``daily`` to ``timeframe`` periods.
+
+    ``sums`` are summed. ``sketches`` maps an output column to ``(sketch_column,
+    exact_day_column)``; ``sets`` maps an output column to a column of JSON arrays whose
+    union is counted. Returns one row per (period, *keys), ordered by period.
+    """
+    sketches = sketches or {}
+    sets = sets or {}
+    keys = list(keys)
+    columns = [date_column] + keys + list(sums) + list(sketches) + list(sets)
+    if daily.empty:
+        return pd.DataFrame(columns=columns)
+
+    df = daily.copy()
+    df[date_column] = period_start(df[date_column], timeframe)
+    df = df.sort_values([date_column] + keys, kind="stable").reset_index(drop=True)
+    groups = df.groupby([date_column] + keys, sort=False)
+    out = groups[list(sums)].sum() if sums else groups.size().to_frame("_rows")[[]]
+    starts = np.flatnonzero(groups.ngroup().diff().fillna(1).to_numpy() != 0)
+
+    for column, (sketch_column, exact_column) in sketches.items():
+        if timeframe == "day":
+            out[column] = groups[exact_column].sum().to_numpy()
+            continue
+        matrix = np.vstack([hll_registers(value) for value in df[sketch_column]])
+        merged = np.maximum.reduceat(matrix, starts, axis=0)
+        out[column] = np.round(hll_estimate(merged)).astype("int64")
+
+    for column, set_column in sets.items():
+        values = df[set_column].map(parse_array)
+        out[column] = [len(set().union(*part)) for part in np.split(values.to_numpy(), starts[1:])]
+
+    return out.reset_index()[columns]
@@ -0,0 +1,79 @@
+"""Satellite bridge transfers matched to Axelar token transfers.
+
+``axelar_satellite_transfers`` stores the result of joining ``AXELAR.DEFI.EZ_BRIDGE_SATELLITE``
+to ``fact_transfers`` on the transaction hash (``SPLIT_PART(id, '_', 1)``). The split is
+computed once per transfer when a day is ingested, the table is clustered by date, and days
+from the watermark onwards are rebuilt on refresh, so the Satellite KPI and time-series
+queries become plain date-pruned scans.
+"""
+import streamlit as st
+
+from axelar_dashboard.incremental import LOOKBACK, execute, read_watermark, refresh_window, write_watermark
+
+SATELLITE_TABLE = "axelar_satellite_transfers"
+SATELLITE_SOURCE = "SELECT block_timestamp FROM AXELAR.DEFI.EZ_BRIDGE_SATELLITE"
+REFRESH_TTL = 3600
+
+
+def ensure_satellite_table(conn):
+    execute(conn, f"""
+    CREATE TABLE IF NOT EXISTS {SATELLITE_TABLE} (
+        date DATE,
+        tx_hash STRING,
+        source_chain STRING,
+        destination_chain STRING,
+        sender STRING,
+        token_symbol STRING,
+        amount FLOAT,
+        amount_usd FLOAT
+    ) CLUSTER BY (date)
+    """)
+
+
+def refresh_satellite(conn):
+    """Rebuild the matched rows for bridge days since the watermark and return the new watermark."""
+    ensure_satellite_table(conn)
+    since, high = refresh_window(conn, SATELLITE_TABLE, SATELLITE_SOURCE, time_column="block_timestamp")
+    if high is None:
+        return read_watermark(conn, SATELLITE_TABLE)
+
+    since_day = since.strftime("%Y-%m-%d")
+    # -- transfers are indexed around the bridge transaction; look back a little further on that side
+    transfers_since = (since - LOOKBACK).strftime("%Y-%m-%d")
+    execute(conn, "BEGIN")
+    try:
+        execute(conn, f"DELETE FROM {SATELLITE_TABLE} WHERE date >= '{since_day}'")
+        execute(conn, f"""
+        INSERT INTO {SATELLITE_TABLE}
+        WITH tab1 AS (
+            SELECT block_timestamp::date AS date, tx_hash, source_chain, destination_chain, sender, token_symbol
+            FROM AXELAR.DEFI.EZ_BRIDGE_SATELLITE
+            WHERE block_timestamp::date >= '{since_day}' AND block_timestamp <= '{high:%Y-%m-%d %H:%M:%S.%f}'
+        ),
+        tab2 AS (
+            SELECT
+                CASE WHEN TRY_TO_DOUBLE(data:send:amount::STRING) IS NOT NULL THEN TRY_TO_DOUBLE(data:send:amount::STRING) END AS amount,
+                CASE
+                  WHEN TRY_TO_DOUBLE(data:send:amount::STRING) IS NOT NULL AND TRY_TO_DOUBLE(data:link:price::STRING) IS NOT NULL
+                  THEN TRY_TO_DOUBLE(data:send:amount::STRING) * TRY_TO_DOUBLE(data:link:price::STRING) END AS amount_usd,
+                SPLIT_PART(id, '_', 1) AS tx_hash
+            FROM axelar.axelscan.fact_transfers
+            WHERE status = 'executed'
+              AND simplified_status = 'received'
+              AND created_at::date >= '{transfers_since}'
+        )
+        SELECT tab1.date, tab1.tx_hash, tab1.source_chain, tab1.destination_chain, sender, token_symbol, amount, amount_usd
+        FROM tab1
+        LEFT JOIN tab2 ON tab1.tx_hash = tab2.tx_hash
+        """)
+        write_watermark(conn, SATELLITE_TABLE, high)
+        execute(conn, "COMMIT")
+    except Exception:
+        execute(conn, "ROLLBACK")
+        raise
+    return high
+
+
+@st.cache_data(ttl=REFRESH_TTL, show_spinner=False)
+def satellite_version(_conn):
+    return str(refresh_satellite(_conn))
@@ -0,0 +1,138 @@
+"""Admission control for warehouse queries.
+
+At most ``MAX_CONCURRENT_QUERIES`` loader queries run at once (set the
+``AXELAR_MAX_CONCURRENT_QUERIES`` environment variable to change it). Callers beyond the
+cap wait in a queue ordered by priority, so KPI cards are admitted before charts and charts
+before tracking tables. Within a priority, sessions are served fairly (start-time fair
+queueing): a session that submits ten queries does not hold back one that submits one.
+Calls made outside a script run, such as :func:`axelar_dashboard.lazy.prefetch`, are
+queued at ``PREFETCH`` priority, and queued calls whose caller has moved on leave the queue.
+A queued call shared by several callers (:func:`axelar_dashboard.db.single_flight`) moves up
+to the most urgent of them: a prefetch that a viewer starts waiting on is requeued at the
+viewer's priority. :meth:`QueryScheduler.stats` reports queue-time metrics per priority.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from streamlit.runtime.scriptrunner import StopException, get_script_run_ctx
+
+KPI = 0
+CHART = 1
+TABLE = 2
+PREFETCH = 3
+PRIORITY_NAMES = {KPI: "kpi", CHART: "chart", TABLE: "table", PREFETCH: "prefetch"}
+
+MAX_CONCURRENT_QUERIES = int(os.environ.get("AXELAR_MAX_CONCURRENT_QUERIES", "4"))
+POLL_INTERVAL = 0.25
+
+
+class QuerySuperseded(StopException):
+    """The script run waiting on a query has been replaced by a newer one."""
+
+
+def current_session():
+    """The calling Streamlit session id, or None off the script thread."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+class QueryScheduler:
+    def __init__(self, max_concurrent=MAX_CONCURRENT_QUERIES):
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queue = []
+        self._seq = itertools.count()
+        self._virtual_time = 0
+        self._session_tags = {}
+        self._waits = {name: {"queries": 0, "queued": 0, "total_wait_s": 0.0, "max_wait_s": 0.0}
+                       for name in PRIORITY_NAMES.values()}
+
+    def _ticket(self, priority, session, admitted):
+        # -- a session's next ticket starts after its previous one, but never before "now"
+        tag = max(self._virtual_time, self._session_tags.get(session, 0)) + 1
+        self._session_tags[session] = tag
+        ticket = (priority, tag, next(self._seq), admitted)
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _acquire(self, priority, session, stale=None, urgency=None):
+        with self._lock:
+            if self._active < self.max_concurrent and not self._queue:
+                self._active += 1
+                return False, priority
+            admitted = threading.Event()
+            ticket = self._ticket(priority, session, admitted)
+        while not admitted.wait(POLL_INTERVAL):
+            if urgency is not None:
+                urgent, session = urgency()
+                if session is None:
+                    urgent = max(urgent, PREFETCH)
+                if urgent < priority:
+                    with self._lock:
+                        if not admitted.is_set():
+                            self._queue.remove(ticket)
+                            heapq.heapify(self._queue)
+                            ticket = self._ticket(urgent, session, admitted)
+                            priority = urgent
+            if stale is not None and stale():
+                with self._lock:
+                    if not admitted.is_set():
+                        self._queue.remove(ticket)
+                        heapq.heapify(self._queue)
+                        raise QuerySuperseded("left the queue")
+                # -- admitted meanwhile: give the slot back
+                self._release()
+                raise QuerySuperseded("left the queue")
+        return True, priority
+
+    def _release(self):
+        with self._lock:
+            if self._queue:
+                # -- hand the slot straight to the next waiter; _active is unchanged
+                _, tag, _, admitted = heapq.heappop(self._queue)
+                self._virtual_time = max(self._virtual_time, tag)
+                admitted.set()
+            else:
+                self._active -= 1
+                if self._active == 0:
+                    self._session_tags.clear()
+
+    def run(self, fetch, priority=CHART, session=None, stale=None, urgency=None):
+        """Run ``fetch()`` once a slot is free and return its result.
+
+        While queued, ``stale()`` is polled; once it returns True the call leaves the queue
+        and raises :class:`QuerySuperseded`. ``urgency()`` is polled too and returns the
+        ``(priority, session)`` the call is now wanted at; a more urgent one requeues it.
+        """
+        if session is None:
+            session = current_session()
+        if session is None:
+            priority = max(priority, PREFETCH)
+        started = time.perf_counter()
+        queued, priority = self._acquire(priority, session, stale, urgency)
+        waited = time.perf_counter() - started
+        with self._lock:
+            waits = self._waits[PRIORITY_NAMES[priority]]
+            waits["queries"] += 1
+            waits["queued"] += queued
+            waits["total_wait_s"] += waited
+            waits["max_wait_s"] = max(waits["max_wait_s"], waited)
+        try:
+            return fetch()
+        finally:
+            self._release()
+
+    def stats(self):
+        with self._lock:
+            per_priority = {}
+            for name, waits in self._waits.items():
+                avg = waits["total_wait_s"] / waits["queries"] if waits["queries"] else 0.0
+                per_priority[name] = dict(waits, avg_wait_s=avg)
+            return {"active": self._active, "waiting": len(self._queue), "priorities": per_priority}
+
+
+scheduler = QueryScheduler()
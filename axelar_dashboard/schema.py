@@ -0,0 +1,138 @@
+"""Compact dtypes for the label columns of loader results.
+
+Chain names, source➡destination paths, service labels, events and token symbols repeat
+across thousands of rows in the tracking and route frames, and again in every cached copy.
+:func:`compact` dictionary-encodes them:
+
+- chain columns become ``category`` columns over one process-wide chain dictionary
+  (:data:`chains`), whose ids are stable for the life of the process;
+- path columns are replaced by two small integer columns, ``<column> src_id`` and
+  ``<column> dst_id``, holding chain ids; :func:`expand_paths` turns them back into one
+  ``category`` column of labels for display;
+- other label columns become ``category`` columns with their own categories.
+
+``category`` columns are written as Arrow dictionary arrays. :func:`memory_report` compares
+each compacted frame's size before and after, keeping the latest frame per name: names are
+table names, not one per date range, so the report stays small for the life of the process.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+PATH_SEPARATOR = "➡"
+SRC_SUFFIX = " src_id"
+DST_SUFFIX = " dst_id"
+
+_lock = threading.Lock()
+_report = {}
+
+
+class ChainDictionary:
+    """Append-only chain name <-> id mapping; id -1 stands for a missing chain."""
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def encode(self, values):
+        values = pd.Series(values, dtype="object")
+        inverse, uniques = pd.factorize(values)
+        with self._lock:
+            for name in uniques:
+                if name not in self._ids:
+                    self._ids[name] = len(self._names)
+                    self._names.append(name)
+            ids = np.array([self._ids[name] for name in uniques] + [-1], dtype="int32")
+        # -- factorize marks missing values with -1, which picks the trailing -1
+        return ids[inverse]
+
+    def names(self):
+        with self._lock:
+            return list(self._names)
+
+
+chains = ChainDictionary()
+
+
+def _id_dtype(count):
+    return "int16" if count < np.iinfo("int16").max else "int32"
+
+
+def chain_category(values):
+    codes = chains.encode(values)
+    return pd.Categorical.from_codes(codes, categories=chains.names())
+
+
+def encode_paths(values):
+    """``(src_ids, dst_ids)`` for ``source➡destination`` labels; missing paths are ``(-1, -1)``."""
+    parts = pd.Series(values, dtype="object").str.split(PATH_SEPARATOR, n=1, expand=True).reindex(columns=[0, 1])
+    src, dst = chains.encode(parts[0]), chains.encode(parts[1])
+    dtype = _id_dtype(len(chains.names()))
+    return src.astype(dtype), dst.astype(dtype)
+
+
+def path_labels(src_ids, dst_ids):
+    """``category`` labels for chain-id pairs, formatted once per distinct pair."""
+    pairs = np.stack([np.asarray(src_ids, dtype="int64"), np.asarray(dst_ids, dtype="int64")], axis=1)
+    uniques, codes = np.unique(pairs, axis=0, return_inverse=True)
+    names = chains.names()
+    valid = (uniques >= 0).all(axis=1)
+    labels = [f"{names[src]}{PATH_SEPARATOR}{names[dst]}" for src, dst in uniques[valid]]
+    remap = np.full(len(uniques), -1)
+    remap[valid] = np.arange(len(labels))
+    return pd.Categorical.from_codes(remap[codes.ravel()], categories=labels)
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compact(df, name=None, chain_columns=(), path_columns=(), label_columns=()):
+    """Dictionary-encode the given columns of ``df``; with ``name``, record it in :func:`memory_report`.
+
+    ``name`` identifies the table, not the arguments it was loaded with; a later frame with
+    the same name replaces the earlier one in the report.
+    """
+    before = frame_bytes(df) if name is not None else 0
+    df = df.copy()
+    for column in chain_columns:
+        df[column] = chain_category(df[column])
+    for column in label_columns:
+        df[column] = df[column].astype("category")
+    for column in path_columns:
+        src, dst = encode_paths(df[column])
+        position = df.columns.get_loc(column)
+        df = df.drop(columns=column)
+        df.insert(position, column + SRC_SUFFIX, src)
+        df.insert(position + 1, column + DST_SUFFIX, dst)
+    if name is not None:
+        with _lock:
+            _report[name] = {"rows": len(df), "object_bytes": before, "compact_bytes": frame_bytes(df)}
+    return df
+
+
+def expand_paths(df):
+    """Replace every ``src_id``/``dst_id`` column pair made by :func:`compact` with its label column."""
+    pairs = [column[:-len(SRC_SUFFIX)] for column in df.columns
+             if column.endswith(SRC_SUFFIX) and column[:-len(SRC_SUFFIX)] + DST_SUFFIX in df.columns]
+    if not pairs:
+        return df
+    df = df.copy()
+    for column in pairs:
+        position = df.columns.get_loc(column + SRC_SUFFIX)
+        labels = path_labels(df[column + SRC_SUFFIX], df[column + DST_SUFFIX])
+        df = df.drop(columns=[column + SRC_SUFFIX, column + DST_SUFFIX])
+        df.insert(position, column, labels)
+    return df
+
+
+def memory_report():
+    """One row per table, for its latest compacted frame: rows, bytes with object columns, bytes compacted, ratio."""
+    with _lock:
+        report = pd.DataFrame.from_dict(_report, orient="index")
+    if report.empty:
+        return report
+    report["ratio"] = report["object_bytes"] / report["compact_bytes"].clip(lower=1)
+    return report.sort_values("object_bytes", ascending=False)
@@ -0,0 +1,266 @@
+"""Process-wide cache of loader results, shared by every session without copying.
+
+``@st.cache_data`` pickles each result and unpickles a fresh copy on every hit, so a hit
+costs time and memory proportional to the frame size, per viewer and rerun. Loaders
+decorated with :func:`shared_cache` instead keep one frame per argument set and hand every
+caller ``df.copy(deep=False)``: a new DataFrame object over the same column arrays, made in
+time proportional to the number of columns, not rows.
+
+The shared arrays stay immutable because this module turns on pandas copy-on-write: a
+page that assigns to a column, or writes into one, works on its own copy of that column
+and never changes the cached frame. Dicts and lists returned next to a frame are small and
+are deep-copied per hit. Like ``st.cache_data``, arguments starting with an underscore are
+not part of the key.
+
+The cache holds at most ``CACHE_BUDGET_MB`` of results (environment variable
+``AXELAR_CACHE_BUDGET_MB``, default 512), measured with ``memory_usage(deep=True)``. When a new
+result does not fit, entries are evicted greedy-dual-size-frequency style: an entry's
+priority is the cache clock plus ``weight x hits / MB``, the lowest goes first and the clock
+rises to it. Small, often-hit and expensive (high ``weight``) results stay; large ones that
+are rarely reused go, and entries not hit for a while age out as the clock rises. Entries
+sit in a heap by priority and the cached bytes are kept as a running total, so an eviction
+costs ``O(log n)``. Sizes are measured once, when a value is stored: frames by
+``memory_usage(deep=True)``, arrays and buffers by ``nbytes``, and containers and plain
+objects (e.g. :class:`axelar_dashboard.matrix.PathMatrix`) by what they hold.
+:func:`shared_cache_stats` reports entries, bytes, hits, misses and evictions per loader.
+
+The other result caches store their values here too, through :func:`cache_get` and
+:func:`cache_put`, and are listed in the stats under their own names: sliced date ranges
+(:mod:`axelar_dashboard.ranges`), prepared tables (:mod:`axelar_dashboard.tables`) and
+figures (:mod:`axelar_dashboard.figures`). One budget and one eviction order cover them all.
+
+Frames of at least ``AXELAR_CACHE_COMPRESS_KB`` are kept compressed
+(:mod:`axelar_dashboard.packed`) and count against the budget at their compressed size. Hits
+on them share a decoded copy kept for the most recently read packed frames; those decoded
+copies count against the budget too.
+"""
+import copy
+import functools
+import heapq
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from axelar_dashboard.packed import PackedFrame, decoded_stats, pack, release
+from axelar_dashboard.schema import frame_bytes
+
+pd.set_option("mode.copy_on_write", True)
+
+CACHE_BUDGET_MB = float(os.environ.get("AXELAR_CACHE_BUDGET_MB", "512"))
+MAX_ENTRIES = 4096
+# -- results smaller than this are weighed as if they were this size
+MIN_BYTES = 64 * 1024
+
+_MISSING = object()
+
+_entries = {}
+# -- (priority, seq, key); an item is stale once its entry was re-prioritized or dropped
+_heap = []
+_seq = itertools.count()
+_bytes = 0
+_lock = threading.Lock()
+_clock = 0.0
+_loaders = {}
+
+
+def loader_name(load):
+    """A loader's identity across pages: Streamlit runs every page as ``__main__``, so the file is part of it."""
+    load = inspect.unwrap(load)
+    return f"{load.__module__}.{load.__qualname__} ({load.__code__.co_filename})"
+
+
+def _loader_stats(loader_id):
+    return _loaders.setdefault(loader_id, {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0})
+
+
+def _pack(value):
+    if isinstance(value, tuple):
+        return tuple(pack(item) for item in value)
+    return pack(value)
+
+
+def _release(value):
+    if isinstance(value, tuple):
+        for item in value:
+            release(item)
+    else:
+        release(value)
+
+
+def _view(value):
+    if isinstance(value, PackedFrame):
+        return value.frame()
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(_view(item) for item in value)
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _size(value):
+    if isinstance(value, PackedFrame):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return frame_bytes(value)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, "nbytes"):
+        # -- NumPy arrays, Arrow buffers and tables
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return sys.getsizeof(value) + sum(_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(name) + _size(item) for name, item in value.items())
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return sys.getsizeof(value) + _size(vars(value))
+    return sys.getsizeof(value)
+
+
+def _prioritize(key, entry):
+    entry["priority"] = _clock + entry["weight"] * entry["hits"] * (1 << 20) / max(entry["bytes"], MIN_BYTES)
+    entry["seq"] = next(_seq)
+    heapq.heappush(_heap, (entry["priority"], entry["seq"], key))
+    if len(_heap) > 2 * len(_entries) + 64:
+        # -- drop the stale items hits and evictions left behind
+        _heap[:] = [(entry["priority"], entry["seq"], key) for key, entry in _entries.items()]
+        heapq.heapify(_heap)
+
+
+def _drop(key, evicted=False):
+    global _bytes
+    entry = _entries.pop(key)
+    _bytes -= entry["bytes"]
+    stats = _loader_stats(key[0])
+    stats["entries"] -= 1
+    stats["bytes"] -= entry["bytes"]
+    stats["evictions"] += evicted
+    _release(entry["value"])
+
+
+def _make_room(size, budget, new=1):
+    global _clock
+    # -- decoded copies of packed frames share the budget
+    while _entries and (_bytes + decoded_stats()["bytes"] + size > budget or len(_entries) + new > MAX_ENTRIES):
+        priority, seq, key = heapq.heappop(_heap)
+        entry = _entries.get(key)
+        if entry is None or entry["seq"] != seq:
+            continue
+        _clock = priority
+        _drop(key, evicted=True)
+
+
+def _get(key, ttl=None):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and ttl is not None and time.monotonic() - entry["stored_at"] >= ttl:
+            _drop(key)
+            entry = None
+        if entry is None:
+            return _MISSING
+        entry["hits"] += 1
+        _prioritize(key, entry)
+        _loader_stats(key[0])["hits"] += 1
+        return entry["value"]
+
+
+def _put(key, stored, weight):
+    global _bytes
+    size = _size(stored)
+    with _lock:
+        stats = _loader_stats(key[0])
+        stats["misses"] += 1
+        if key in _entries:
+            # -- another caller stored it meanwhile
+            _drop(key)
+        budget = CACHE_BUDGET_MB * (1 << 20)
+        if size > budget:
+            return
+        _make_room(size, budget)
+        entry = {"value": stored, "stored_at": time.monotonic(), "bytes": size, "weight": weight, "hits": 1}
+        _entries[key] = entry
+        _prioritize(key, entry)
+        _bytes += size
+        stats["entries"] += 1
+        stats["bytes"] += size
+
+
+def cache_get(key):
+    """The value :func:`cache_put` stored under ``key``, or None. ``key[0]`` names the cache in the stats."""
+    value = _get(key)
+    return None if value is _MISSING else value
+
+
+def cache_put(key, value, weight=1.0):
+    """Store ``value`` under ``key`` within the shared budget. It is handed out as is: callers must not mutate it."""
+    _put(key, value, weight)
+
+
+def cache_resize(key, value, delta):
+    """Count ``delta`` more bytes (or fewer, if negative) for ``value``, stored under ``key``.
+
+    For values that grow caches of their own after they were stored; a no-op once ``value``
+    is no longer the one cached under ``key``.
+    """
+    global _bytes
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry["value"] is not value:
+            return
+        entry["bytes"] += delta
+        _bytes += delta
+        _loader_stats(key[0])["bytes"] += delta
+        _prioritize(key, entry)
+        if delta > 0:
+            _make_room(0, CACHE_BUDGET_MB * (1 << 20), new=0)
+
+
+def shared_cache(ttl=None, weight=1.0):
+    """Cache a loader's result process-wide.
+
+    ``ttl`` (seconds) bounds an entry's age; ``weight`` is the relative cost of recomputing
+    one of its results, so heavier loaders keep their entries longer under memory pressure.
+    """
+
+    def decorate(load):
+        signature = inspect.signature(load)
+        loader_id = loader_name(load)
+
+        @functools.wraps(load)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (loader_id,) + tuple((name, repr(value)) for name, value in bound.arguments.items()
+                                       if not name.startswith("_"))
+            stored = _get(key, ttl)
+            if stored is not _MISSING:
+                return _view(stored)
+            value = load(*args, **kwargs)
+            _put(key, _pack(value), weight)
+            return _view(value)
+
+        return wrapper
+
+    return decorate
+
+
+def clear_shared_cache():
+    with _lock:
+        for key in list(_entries):
+            _drop(key)
+        _heap.clear()
+
+
+def shared_cache_stats():
+    """Totals and per-loader entries, bytes, hits, misses and evictions."""
+    with _lock:
+        loaders = {name: dict(stats) for name, stats in _loaders.items()}
+    totals = {field: sum(stats[field] for stats in loaders.values())
+              for field in ("entries", "bytes", "hits", "misses", "evictions")}
+    return dict(totals, budget_bytes=int(CACHE_BUDGET_MB * (1 << 20)), decoded=decoded_stats(), loaders=loaders)
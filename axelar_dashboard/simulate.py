@@ -0,0 +1,81 @@
+"""Exercise the query scheduler against a simulated warehouse.
+
+    python -m axelar_dashboard.simulate --sessions 12 --cap 4
+
+Each simulated session issues what a page load does: two fast KPI queries, a few chart
+queries and several slow tracking-table queries, all at once. The stand-in warehouse sleeps
+for a random, priority-dependent latency instead of querying Snowflake and records its peak
+concurrency, so the cap, priority order and per-session fairness can be checked without
+credentials.
+"""
+import argparse
+import random
+import threading
+import time
+
+from axelar_dashboard.scheduler import CHART, KPI, PRIORITY_NAMES, TABLE, QueryScheduler
+
+# -- (mean, jitter) seconds per query kind
+LATENCY = {KPI: (0.05, 0.02), CHART: (0.2, 0.1), TABLE: (0.6, 0.3)}
+PAGE_LOAD = [KPI] * 2 + [CHART] * 4 + [TABLE] * 3
+
+
+class SimulatedWarehouse:
+    def __init__(self, latency=LATENCY, seed=0):
+        self.latency = latency
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def query(self, priority):
+        mean, jitter = self.latency[priority]
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            delay = max(0.0, self.random.uniform(mean - jitter, mean + jitter))
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self.running -= 1
+        return delay
+
+
+def simulate(sessions, cap, seed=0):
+    warehouse = SimulatedWarehouse(seed=seed)
+    scheduler = QueryScheduler(max_concurrent=cap)
+    threads = []
+    for session in range(sessions):
+        for priority in PAGE_LOAD:
+            thread = threading.Thread(target=scheduler.run,
+                                      args=(lambda p=priority: warehouse.query(p), priority, f"session-{session}"))
+            threads.append(thread)
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return scheduler.stats(), warehouse.peak, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--cap", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats, peak, elapsed = simulate(args.sessions, args.cap, args.seed)
+    print(f"{args.sessions} sessions, cap {args.cap}: peak concurrency {peak}, wall time {elapsed:.2f}s")
+    for priority in sorted(PRIORITY_NAMES):
+        waits = stats["priorities"][PRIORITY_NAMES[priority]]
+        if waits["queries"]:
+            print(f"  {PRIORITY_NAMES[priority]:>8}: {waits['queries']:4d} queries, {waits['queued']:4d} queued, "
+                  f"avg wait {waits['avg_wait_s']:.3f}s, max wait {waits['max_wait_s']:.3f}s")
+    if peak > args.cap:
+        raise SystemExit(f"peak concurrency {peak} exceeded the cap {args.cap}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Export the source tables the dashboard reads to a local Parquet snapshot.
+
+    python -m axelar_dashboard.snapshot --out snapshot
+
+Each table in :data:`SNAPSHOT_TABLES` is written as one Parquet file per calendar month,
+``<out>/<table>/month=YYYY-MM/part-0.parquet``, sorted by its time column. Only the columns
+the pages use are kept, with VARIANT columns serialized to JSON text. Months already in the
+snapshot are kept, except the latest one, which is re-exported along with any missing or newer
+months, so rerunning the command brings the snapshot up to date. Credentials come from
+``st.secrets["snowflake"]`` (``.streamlit/secrets.toml``), as for the pages.
+
+By default every table is exported from its first row: first-seen users and new/returning
+splits are computed over the whole snapshot, so a snapshot that starts later counts users
+already seen before its start as new. ``--start`` still cuts the history short, e.g. for a
+quick local copy; a table whose months do not reach back to its first row gets a ``START``
+file with its first exported month, which :func:`snapshot_start` reports so the pages can
+warn that their results are incomplete.
+
+Set ``AXELAR_SNAPSHOT_DIR=<out>`` to run the pages against the snapshot
+(:mod:`axelar_dashboard.local`).
+"""
+import argparse
+import os
+
+import pandas as pd
+import streamlit as st
+
+from axelar_dashboard.backend import snowflake_connection
+
+# -- name: (Snowflake table, time column, exported columns)
+SNAPSHOT_TABLES = {
+    "fact_transfers": ("axelar.axelscan.fact_transfers", "created_at", [
+        "id", "created_at::TIMESTAMP_NTZ AS created_at", "status", "simplified_status",
+        "sender_address", "recipient_address", "TO_JSON(data) AS data",
+    ]),
+    "fact_gmp": ("axelar.axelscan.fact_gmp", "created_at", [
+        "id", "created_at::TIMESTAMP_NTZ AS created_at", "event", "status", "simplified_status",
+        "TO_JSON(data) AS data",
+    ]),
+    "ez_bridge_satellite": ("axelar.defi.ez_bridge_satellite", "block_timestamp", [
+        "block_timestamp::TIMESTAMP_NTZ AS block_timestamp", "tx_hash", "source_chain",
+        "destination_chain", "sender", "token_symbol",
+    ]),
+}
+
+
+def partition_path(out, table, month):
+    return os.path.join(out, table, f"month={month:%Y-%m}", "part-0.parquet")
+
+
+def exported_months(out, table):
+    folder = os.path.join(out, table)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(pd.Period(name.split("=", 1)[1], "M") for name in os.listdir(folder) if name.startswith("month="))
+
+
+def export_month(conn, out, table, month):
+    """Write one month of ``table`` and return its row count."""
+    source, time_column, columns = SNAPSHOT_TABLES[table]
+    query = f"""
+    SELECT {", ".join(columns)}
+    FROM {source}
+    WHERE {time_column} >= '{month.start_time:%Y-%m-%d}' AND {time_column} < '{(month + 1).start_time:%Y-%m-%d}'
+    ORDER BY {time_column}
+    """
+    with conn.cursor() as cur:
+        cur.execute(query)
+        rows = cur.fetchall()
+        names = [col[0].lower() for col in cur.description]
+    df = pd.DataFrame.from_records(rows, columns=names, coerce_float=True)
+
+    path = partition_path(out, table, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # -- write beside the partition and swap it in, so readers never see a half-written file
+    df.to_parquet(path + ".tmp", index=False, compression="zstd")
+    os.replace(path + ".tmp", path)
+    return len(df)
+
+
+def first_row_month(conn, table):
+    source, time_column, _ = SNAPSHOT_TABLES[table]
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT MIN({time_column})::DATE FROM {source}")
+        first = cur.fetchall()[0][0]
+    return pd.Period(first, "M") if first is not None else None
+
+
+def start_marker(out, table):
+    return os.path.join(out, table, "START")
+
+
+def snapshot_start(out):
+    """The latest ``--start`` cut among the snapshot's tables, or None when they hold their full history."""
+    cuts = []
+    for table in SNAPSHOT_TABLES:
+        try:
+            with open(start_marker(out, table)) as f:
+                cuts.append(pd.Timestamp(f.read().strip()))
+        except FileNotFoundError:
+            continue
+    return max(cuts) if cuts else None
+
+
+def export(conn, out, start, end, tables=tuple(SNAPSHOT_TABLES)):
+    """Export ``tables`` from ``start`` (their first row when None) to ``end``."""
+    for table in tables:
+        first = first_row_month(conn, table)
+        if first is None:
+            continue
+        done = exported_months(out, table)
+        since = max(first, pd.Period(start, "M")) if start is not None else first
+        for month in pd.period_range(since, pd.Period(end, "M"), freq="M"):
+            # -- the latest exported month may have been partial; export it again
+            if month in done and month != done[-1]:
+                continue
+            rows = export_month(conn, out, table, month)
+            print(f"{table} {month}: {rows:,} rows")
+
+        # -- mark a snapshot that does not reach back to the table's first row
+        exported = exported_months(out, table)
+        if exported and exported[0] > first:
+            with open(start_marker(out, table), "w") as f:
+                f.write(f"{exported[0].start_time:%Y-%m-%d}")
+        elif os.path.exists(start_marker(out, table)):
+            os.remove(start_marker(out, table))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="snapshot")
+    parser.add_argument("--start", default=None, help="first month to export (default: each table's first row)")
+    parser.add_argument("--end", default=pd.Timestamp.today().strftime("%Y-%m-%d"))
+    parser.add_argument("--tables", nargs="+", choices=list(SNAPSHOT_TABLES), default=list(SNAPSHOT_TABLES))
+    args = parser.parse_args()
+
+    conn = snowflake_connection(st.secrets["snowflake"])
+    try:
+        export(conn, args.out, args.start, args.end, args.tables)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Table rendering for the dashboard pages.
+
+Frames are shown with their numeric dtypes intact: thousands separators come from
+``st.column_config.NumberColumn`` (formatted in the browser) or, for tinted tables, from a
+``Styler`` format, instead of converting every cell to a string. Each table is prepared once
+per ``key``, which identifies its data the way a figure's ``data_key`` does
+(:mod:`axelar_dashboard.figures`): the loader, its arguments and data versions, and the
+widget values that filter its rows. The frame itself is never hashed, so a rerun finds its
+table in time independent of the row count. Every sort column's order is an ``argsort``
+computed on first use, so changing "Sort by" is a cached lookup plus one ``take``. Large
+tables are paginated on the server: only the visible page (after an optional substring
+search) is sent to the browser. Prepared tables are kept in the shared loader cache
+(:mod:`axelar_dashboard.shared`); the sort orders and search masks a table gathers are added
+to its size there as they are computed.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from axelar_dashboard.schema import expand_paths
+from axelar_dashboard.shared import cache_get, cache_put, cache_resize
+
+MAX_CACHED_SEARCHES = 32
+PAGE_SIZE = 25
+
+
+class PreparedTable:
+    """A table ready to show; its sort orders and search masks count against the cache budget."""
+
+    def __init__(self, df, key=None):
+        # -- path columns are cached as chain-id pairs (axelar_dashboard.schema); label them once here
+        df = expand_paths(df).reset_index(drop=True)
+        for col in df.columns[df.dtypes == object]:
+            # -- Snowflake NUMBER(p, s) columns arrive as Decimal objects
+            converted = pd.to_numeric(df[col], errors="coerce")
+            if converted.notna().sum() == df[col].notna().sum():
+                df[col] = converted
+        self.df = df
+        self.numeric = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+        self.formats = {}
+        for col in self.numeric:
+            values = df[col].to_numpy(dtype="float64")
+            integral = np.all(np.isnan(values) | (np.mod(values, 1) == 0))
+            self.formats[col] = "{:,.0f}" if integral else "{:,}"
+        self.key = key
+        self.orders = {}
+        self.searches = {}
+
+    def _grew(self, delta):
+        if self.key is not None:
+            cache_resize(self.key, self, delta)
+
+    def order(self, by, ascending):
+        if (by, ascending) not in self.orders:
+            values = self.df[by].to_numpy()
+            if by in self.numeric:
+                values = values.astype("float64")
+                order = np.argsort(values if ascending else -values, kind="stable")
+            else:
+                order = np.argsort(values.astype(str), kind="stable")
+                order = order if ascending else order[::-1]
+            self.orders[(by, ascending)] = order
+            self._grew(order.nbytes)
+        return self.orders[(by, ascending)]
+
+    def matches(self, column, text):
+        """Boolean mask of rows whose ``column`` contains ``text`` (case-insensitive)."""
+        text = text.strip().lower()
+        if (column, text) not in self.searches:
+            if len(self.searches) >= MAX_CACHED_SEARCHES:
+                self._grew(-sum(mask.nbytes for mask in self.searches.values()))
+                self.searches.clear()
+            haystack = self.df[column].astype(str).str.lower()
+            mask = haystack.str.contains(text, regex=False).to_numpy()
+            self.searches[(column, text)] = mask
+            self._grew(mask.nbytes)
+        return self.searches[(column, text)]
+
+    def view(self, sort_by=None, ascending=False):
+        order = np.arange(len(self.df)) if sort_by is None else self.order(sort_by, ascending)
+        return self.page(order, 0, len(order))
+
+    def page(self, order, start, size):
+        rows = order[start:start + size]
+        view = self.df.take(rows)
+        view.index = np.arange(start + 1, start + 1 + len(rows))
+        return view
+
+
+def prepare_table(df, key):
+    """Return the cached :class:`PreparedTable` for ``key`` (build it from ``df`` on a miss).
+
+    ``key`` must change whenever ``df``'s rows can: the loader name, its arguments and data
+    versions, and any widget values applied to its result.
+    """
+    key = ("prepared tables", repr(key))
+    table = cache_get(key)
+    if table is None:
+        table = PreparedTable(df, key)
+        cache_put(key, table)
+    return table
+
+
+def show_table(view, table, background=None, height=None):
+    if background:
+        styler = view.style.format({col: fmt for col, fmt in table.formats.items() if col in view.columns}, na_rep="")
+        styler = styler.set_properties(**{"background-color": background})
+        st.dataframe(styler, use_container_width=True, height=height)
+    else:
+        column_config = {col: st.column_config.NumberColumn(format="localized") for col in table.numeric}
+        st.dataframe(view, column_config=column_config, use_container_width=True, height=height)
+
+
+def render_table(df, key, sort_by=None, ascending=False, background=None, height=None):
+    table = prepare_table(df, key)
+    show_table(table.view(sort_by, ascending), table, background=background, height=height)
+
+
+def render_paginated_table(df, key, widget_key, sort_by=None, ascending=False, search_column=None,
+                           page_size=PAGE_SIZE, background=None):
+    """Like :func:`render_table`, but only ships one page of the (searched, sorted) rows.
+
+    ``widget_key`` is a plain string used to key the search box and page selector.
+    """
+    table = prepare_table(df, key)
+    order = np.arange(len(table.df)) if sort_by is None else table.order(sort_by, ascending)
+
+    col1, col2 = st.columns([3, 1])
+    if search_column is not None:
+        with col1:
+            text = st.text_input(f"🔎 Search {search_column}", key=f"{widget_key}_search",
+                                 placeholder="e.g. ethereum or ➡osmosis")
+        if text.strip():
+            order = order[table.matches(search_column, text)[order]]
+
+    total = len(order)
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{widget_key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    with col2:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    show_table(table.page(order, start, page_size), table, background=background)
+    st.caption(f"Showing {min(start + 1, total):,}–{min(start + page_size, total):,} of {total:,} rows")